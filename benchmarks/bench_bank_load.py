@@ -0,0 +1,94 @@
+"""
+Бенчмарк холодной загрузки банка: JSON + pydantic против скомпилированного .qbank.
+Банк на 10k вопросов генерируется во временной папке, каждый путь меряется
+в отдельном процессе (время загрузки + прирост RSS по /proc, Linux).
+Запуск: python -m benchmarks.bench_bank_load [--questions 10000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, os, sys, time
+from pathlib import Path
+from library.question_bank import QuestionBankCache
+import library.bank_compiler  # импорт не входит в замер
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+rss_before = rss_kb()
+cache = QuestionBankCache(Path(sys.argv[1]))
+t0 = time.perf_counter()
+bank = cache.get("bench")
+elapsed = time.perf_counter() - t0
+print(json.dumps({"seconds": elapsed, "rss_kb": rss_kb() - rss_before, "questions": len(bank.questions)}))
+"""
+
+
+def generate_bank(path: Path, count: int) -> None:
+    """Синтетический банк: 5 вариантов, 1-2 правильных."""
+    items = [
+        {
+            "question": f"Вопрос №{i}: какой из вариантов соответствует норме {i % 97}?",
+            "options": [f"Вариант {j} для вопроса {i}" for j in range(1, 6)],
+            "correct_answers": f"{i % 5 + 1}" if i % 3 else f"{i % 5 + 1},{(i + 2) % 5 + 1}",
+        }
+        for i in range(count)
+    ]
+    path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+
+
+def run_child(questions_dir: Path) -> dict:
+    env = dict(os.environ, PYTHONPATH=str(ROOT), LOG_LEVEL="ERROR", USE_FILE_LOGGING="false")
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, str(questions_dir)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(questions_dir: Path, repeat: int) -> dict:
+    runs = [run_child(questions_dir) for _ in range(repeat)]
+    return {
+        "seconds": statistics.median(r["seconds"] for r in runs),
+        "rss_kb": statistics.median(r["rss_kb"] for r in runs),
+        "questions": runs[0]["questions"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    from library.bank_compiler import compile_bank
+
+    with tempfile.TemporaryDirectory() as tmp:
+        questions_dir = Path(tmp)
+        json_path = questions_dir / "bench.json"
+        generate_bank(json_path, args.questions)
+
+        json_result = measure(questions_dir, args.repeat)
+        compiled = compile_bank("bench", json_path)
+        compiled_result = measure(questions_dir, args.repeat)
+
+        print(f"Банк: {json_result['questions']} вопросов, "
+              f"JSON {json_path.stat().st_size // 1024} KB, .qbank {compiled.stat().st_size // 1024} KB")
+        for name, r in (("json+pydantic", json_result), ("qbank", compiled_result)):
+            print(f"{name:>14}: {r['seconds'] * 1000:8.1f} ms, RSS +{r['rss_kb'] / 1024:6.1f} MB")
+        print(f"Ускорение: x{json_result['seconds'] / compiled_result['seconds']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Разбор + маршрут одного callback'а без aiogram: как было (цепочка сравнений/startswith
+по 11 роутерам + split) vs library.callbacks.decode + dict действий. Плюс размер
+callback data в байтах (лимит Telegram — 64).
+Запуск: python -m benchmarks.bench_callbacks [--taps 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--taps", type=int, default=100000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("API_TOKEN", "0:bench")
+    sys.path.insert(0, str(ROOT))
+    from library import callbacks
+
+    specs = callbacks.SPECIALIZATIONS
+    levels = callbacks.DIFFICULTIES
+
+    def legacy_route(data: str):
+        """Роутеры по очереди, в каждом 4 фильтра; аргумент — split по месту."""
+        for _spec in specs:
+            if data == _spec:
+                return "start", data
+            if data.startswith("diff_"):
+                return "difficulty", data.split("_", 1)[1]
+            if data.startswith("ans_"):
+                return "answer", int(data.split("_")[1])
+            if data == "next_question":
+                return "next", None
+        return None
+
+    table = {action: action for action in callbacks.SCHEMA}
+
+    def route(data: str):
+        payload = callbacks.decode(data)
+        return payload and (table.get(payload.action), payload)
+
+    rng = random.Random(1)
+    kinds = rng.choices(["spec", "diff", "ans", "next"], weights=[1, 1, 30, 8], k=args.taps)
+    legacy, compact = [], []
+    for kind in kinds:
+        spec, level = rng.choice(specs), rng.choice(levels)
+        question, option = rng.randrange(40), rng.randint(1, 6)
+        legacy.append({
+            "spec": spec, "diff": f"diff_{level.value}", "ans": f"ans_{option}", "next": "next_question"
+        }[kind])
+        compact.append({
+            "spec": callbacks.start(spec),
+            "diff": callbacks.difficulty(level),
+            "ans": callbacks.answer(question, option),
+            "next": callbacks.next_question(question),
+        }[kind])
+    assert all(route(data) for data in compact)
+
+    cases = [
+        ("было: фильтры + split", lambda: [legacy_route(d) for d in legacy], legacy),
+        ("decode + dict", lambda: [route(d) for d in compact], compact),
+    ]
+    print(f"{args.taps} тапов (старт/сложность/вариант/далее ≈ 1/1/30/8)")
+    for name, fn, payloads in cases:
+        seconds = min(timeit.repeat(fn, number=1, repeat=5))
+        sizes = [len(d.encode()) for d in payloads]
+        print(
+            f"{name:>24}: {seconds * 1e9 / len(payloads):7.0f} нс/callback | "
+            f"callback data {sum(sizes) / len(sizes):4.1f} байт в среднем, макс {max(sizes)}"
+        )
+    worst = specs[-1]  # Последний роутер: до него 10 промахов
+    worst_compact = callbacks.start(worst)
+    for name, fn in (
+        (f"было: {worst}", lambda: legacy_route(worst)),
+        (f"decode: {worst}", lambda: route(worst_compact)),
+    ):
+        print(f"{name:>24}: {min(timeit.repeat(fn, number=10000, repeat=5)) * 1e5:7.0f} нс/callback")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Маршрутизация callback'ов: 11 копий роутера с магическими фильтрами (как было) vs
+один роутер-движок specializations.engine (callbacks.decode → dict действий).
+Через Dispatcher.feed_update гоняется одинаковый поток тапов; действия — пустые,
+т.е. меряется только путь апдейта до хэндлера.
+Запуск: python -m benchmarks.bench_dispatch [--updates 20000]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def legacy_dispatcher(specs):
+    """Как до движка: на специализацию свой Router с 4 callback-фильтрами."""
+    from aiogram import Dispatcher, F, Router
+    from aiogram.fsm.storage.memory import MemoryStorage
+
+    async def noop(callback):
+        pass
+
+    dp = Dispatcher(storage=MemoryStorage())
+    dp.include_router(Router(name="main"))  # /start — callback'ов нет
+    for spec in specs:
+        router = Router(name=spec)
+        router.callback_query.register(noop, F.data == spec)
+        router.callback_query.register(noop, F.data.startswith("diff_"))
+        router.callback_query.register(noop, F.data.startswith("ans_"))
+        router.callback_query.register(noop, F.data == "next_question")
+        dp.include_router(router)
+    return dp
+
+
+def engine_dispatcher():
+    from aiogram import Dispatcher, Router
+    from aiogram.fsm.storage.memory import MemoryStorage
+    from specializations.engine import ACTIONS, create_router
+
+    async def noop(callback, state, payload):
+        pass
+
+    dp = Dispatcher(storage=MemoryStorage())
+    dp.include_router(Router(name="main"))
+    dp.include_router(create_router({action: noop for action in ACTIONS}))
+    return dp
+
+
+def make_updates(count, payloads):
+    from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+    user = User(id=1, is_bot=False, first_name="bench")
+    message = Message(message_id=1, date=datetime.now(), chat=Chat(id=1, type="private"))
+    return [
+        Update(update_id=i, callback_query=CallbackQuery(
+            id=str(i), from_user=user, chat_instance="1", message=message, data=payloads[i % len(payloads)]
+        ))
+        for i in range(count)
+    ]
+
+
+async def measure(dp, bot, updates) -> float:
+    for update in updates[:200]:  # Прогрев
+        await dp.feed_update(bot, update)
+    t0 = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    return (time.perf_counter() - t0) * 1e6 / len(updates)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=20000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("API_TOKEN", "0:bench")
+    sys.path.insert(0, str(ROOT))
+    from aiogram import Bot
+    from config.settings import settings
+    from library import callbacks
+
+    specs = settings.specializations
+    rng = random.Random(1)
+    # Поток как в проде: в основном тапы по вариантам и «Далее», изредка старт/сложность
+    taps = rng.choices(["spec", "diff", "ans", "next"], weights=[1, 1, 30, 8], k=1000)
+    legacy_payloads, engine_payloads = [], []
+    for kind in taps:
+        spec, option = rng.choice(specs), rng.randint(1, 6)
+        legacy_payloads.append({
+            "spec": spec, "diff": "diff_базовый", "ans": f"ans_{option}", "next": "next_question"
+        }[kind])
+        engine_payloads.append({
+            "spec": callbacks.start(spec),
+            "diff": callbacks.difficulty(callbacks.DIFFICULTIES[1]),
+            "ans": callbacks.answer(0, option),
+            "next": callbacks.next_question(0),
+        }[kind])
+
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)  # Лог на каждый апдейт исказит замер
+    bot = Bot("1:bench")
+    worst = specs[-1]  # Последний роутер: апдейт проходит фильтры всех предыдущих
+    cases = [
+        ("11 роутеров: поток", legacy_dispatcher(specs), make_updates(args.updates, legacy_payloads)),
+        ("движок: поток", engine_dispatcher(), make_updates(args.updates, engine_payloads)),
+        (f"11 роутеров: {worst}", legacy_dispatcher(specs), make_updates(args.updates, [worst])),
+        (f"движок: {worst}", engine_dispatcher(),
+         make_updates(args.updates, [callbacks.start(worst)])),
+    ]
+    print(f"{args.updates} callback-апдейтов через Dispatcher.feed_update")
+    for name, dp, updates in cases:
+        print(f"{name:>28}: {await measure(dp, bot, updates):8.1f} мкс/апдейт")
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
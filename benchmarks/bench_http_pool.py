@@ -0,0 +1,65 @@
+"""
+Пропускная способность TunedAiohttpSession при разных размерах пула.
+Поднимает stub Bot API (benchmarks.stub_telegram) с задержкой ответа --latency
+и шлёт --requests sendMessage с --concurrency одновременных вызовов.
+Запуск: python -m benchmarks.bench_http_pool [--pools 1,4,16,64] [--latency 0.02]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def run_pool(port: int, pool_size: int, requests: int, concurrency: int) -> dict:
+    from aiogram import Bot
+    from library.http_session import TunedAiohttpSession
+
+    session = TunedAiohttpSession(api_url=f"http://127.0.0.1:{port}", pool_size=pool_size)
+    bot = Bot("1:bench", session=session)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i: int):
+        async with semaphore:
+            await bot.send_message(chat_id=1000 + i % 500, text=f"m{i}")
+
+    await send(0)  # Прогрев соединения
+    t0 = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(requests)))
+    elapsed = time.perf_counter() - t0
+    summary = session.latency_summary()["sendMessage"]
+    await session.close()
+    return {"rps": requests / elapsed, **summary}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pools", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=128)
+    parser.add_argument("--latency", type=float, default=0.02, help="Задержка stub API, сек")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    os.environ.setdefault("API_TOKEN", "0:bench")
+    sys.path.insert(0, str(ROOT))
+    from benchmarks.stub_telegram import serve
+
+    stub, runner = await serve("127.0.0.1", args.port, args.latency)
+    print(f"{args.requests} sendMessage, {args.concurrency} одновременно, задержка API {args.latency * 1000:.0f} мс")
+    try:
+        for pool in map(int, args.pools.split(",")):
+            r = await run_pool(args.port, pool, args.requests, args.concurrency)
+            print(
+                f"пул {pool:>4}: {r['rps']:8.0f} запр/с | avg {r['avg_ms']:7.1f} мс | "
+                f"p50 ≤{r['p50_ms']:6.0f} мс | p99 ≤{r['p99_ms']:6.0f} мс | ошибок {r['errors']}"
+            )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
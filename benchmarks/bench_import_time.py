@@ -0,0 +1,86 @@
+"""
+Бюджет холодного старта: `python -X importtime -c "import test_bot_main"` в новом
+интерпретаторе, лучший из --runs запусков. Падает (код 1), если импорт дольше
+--budget-ms целиком или код проекта (config/library/specializations/assets) дольше
+--own-budget-ms, а также если импорт создал каталоги logs/data или что-то напечатал
+(побочные эффекты). Токен не передаётся: импорт не должен его проверять.
+Бюджеты по умолчанию — из IMPORT_BUDGET_MS / IMPORT_OWN_BUDGET_MS.
+Запуск: python -m benchmarks.bench_import_time [--runs 3] [--budget-ms 6000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+OWN_PACKAGES = {"test_bot_main", "config", "library", "specializations", "assets"}
+
+
+def measure(module: str) -> Tuple[int, Dict[str, int], bool]:
+    """(мкс на импорт module, self-мкс по модулям проекта, были ли побочные эффекты)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **{k: v for k, v in os.environ.items() if k != "API_TOKEN"},  # Импорт не требует токена
+            # Каталоги, которые создал бы импорт с побочными эффектами
+            "LOGS_DIR": f"{tmp}/logs", "DATA_DIR": f"{tmp}/data", "CERTS_DIR": f"{tmp}/data/certificates",
+        }
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        output = proc.stdout.strip() or any(
+            line and not line.startswith("import time:") for line in proc.stderr.splitlines()
+        )
+        side_effects = any(Path(tmp).iterdir()) or bool(output)
+
+    total, own = 0, defaultdict(int)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name == module:
+            total = int(cumulative_us)
+        if name.split(".")[0] in OWN_PACKAGES:
+            own[name] += int(self_us)
+    return total, dict(own), side_effects
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="test_bot_main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 6000)))
+    parser.add_argument("--own-budget-ms", type=float, default=float(os.getenv("IMPORT_OWN_BUDGET_MS", 150)))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    total, own, side_effects = min(runs, key=lambda r: r[0])
+    own_total = sum(own.values())
+
+    print(f"import {args.module}: {total / 1000:.0f} мс (лучший из {args.runs}), бюджет {args.budget_ms:.0f} мс")
+    print(f"  код проекта: {own_total / 1000:.1f} мс, бюджет {args.own_budget_ms:.0f} мс")
+    for name, self_us in sorted(own.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:>36}: {self_us / 1000:6.1f} мс")
+
+    failures = []
+    if total / 1000 > args.budget_ms:
+        failures.append(f"импорт {total / 1000:.0f} мс > {args.budget_ms:.0f} мс")
+    if own_total / 1000 > args.own_budget_ms:
+        failures.append(f"код проекта {own_total / 1000:.1f} мс > {args.own_budget_ms:.0f} мс")
+    if any(r[2] for r in runs):
+        failures.append("импорт создал каталоги logs/data или писал в вывод — побочный эффект на импорте")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ В бюджете")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
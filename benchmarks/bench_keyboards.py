@@ -0,0 +1,55 @@
+"""
+Бенчмарк построения разметки: InlineKeyboardBuilder с нуля vs кэш library.keyboards.
+Клавиатура теста — на каждый тап (вопрос × маска), статичные — на каждый показ меню.
+Запуск: python -m benchmarks.bench_keyboards [--questions 200] [--rounds 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("API_TOKEN", "0:bench")
+    sys.path.insert(0, str(ROOT))
+    from library import keyboards
+
+    rng = random.Random(1)
+    questions = [
+        tuple(f"Вариант {q}.{i} — формулировка ответа" for i in range(rng.randint(3, 6)))
+        for q in range(args.questions)
+    ]
+    taps = [(q, rng.randrange(1 << len(q))) for q in (rng.choice(questions) for _ in range(args.rounds))]
+
+    def run(build):
+        return lambda: [build(options, mask, 0) for options, mask in taps]
+
+    uncached = keyboards._build_test_keyboard.__wrapped__
+    cases = [
+        ("тест: builder", run(uncached), len(taps)),
+        ("тест: LRU", run(keyboards.get_test_keyboard), len(taps)),
+    ]
+    for name in ("get_main_keyboard", "get_difficulty_keyboard", "get_finish_keyboard"):
+        cached = getattr(keyboards, name)
+        cases.append((f"{name}: builder", lambda f=cached.__wrapped__: [f() for _ in range(1000)], 1000))
+        cases.append((f"{name}: кэш", lambda f=cached: [f() for _ in range(1000)], 1000))
+
+    print(f"{args.questions} вопросов, {len(taps)} тапов (вопрос × случайная маска)")
+    run(keyboards.get_test_keyboard)()  # Прогрев LRU
+    for name, fn, count in cases:
+        seconds = min(timeit.repeat(fn, number=1, repeat=3))
+        print(f"{name:>34}: {seconds * 1e6 / count:8.2f} мкс/шт")
+    print(f"LRU: {keyboards._build_test_keyboard.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Память на активную сессию: копии Question в каждой сессии против общего банка.
+До: каждая сессия держит свои Question, разобранные из JSON при старте.
+После: сессия держит ссылку на банк и кортеж индексов.
+Запуск: python -m benchmarks.bench_session_memory [--sessions 2000] [--spec oupds]
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure(build, sessions: int) -> float:
+    """Байт на сессию: прирост трассируемой памяти / число сессий."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = [build(i) for i in range(sessions)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del keep
+    return size / sessions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--spec", default="oupds")
+    parser.add_argument("--difficulty", default="резерв")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    from config.settings import settings
+    from library.models import CurrentTestState, Difficulty, Question
+    from library.question_bank import question_bank_cache
+
+    difficulty = Difficulty(args.difficulty)
+    count = settings.difficulty_questions[difficulty.value]
+    raw = json.loads(question_bank_cache.path_for(args.spec).read_text(encoding="utf-8"))
+    bank = question_bank_cache.get(args.spec)
+
+    def legacy_session(user_id: int):
+        # Старый путь: свежие pydantic Question на каждый старт теста
+        items = random.Random(user_id).sample(raw, min(count, len(raw)))
+        return [
+            Question(
+                question=item["question"],
+                options=item["options"],
+                correct_answers={int(x) for x in item["correct_answers"].split(",")}
+            )
+            for item in json.loads(json.dumps(items))
+        ]
+
+    def shared_session(user_id: int):
+        ids = tuple(bank.sample_ids(difficulty, count, random.Random(user_id)))
+        return CurrentTestState(bank=bank, question_ids=ids, specialization=args.spec, difficulty=difficulty)
+
+    before = measure(legacy_session, args.sessions)
+    after = measure(shared_session, args.sessions)
+    print(f"{args.sessions} сессий × {count} вопросов ({args.spec}:{difficulty.value})")
+    print(f"  копии Question: {before:10.0f} байт/сессия")
+    print(f"  общий банк:     {after:10.0f} байт/сессия  (x{before / after:.1f} меньше)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Микробенчмарк горячего пути сессии: toggle / next / finish в секунду.
+Сравнивает прежний pydantic CurrentTestState (копия baseline-модели: set ответов)
+со slotted dataclass из library.models (битовые маски ответов).
+Запуск: python -m benchmarks.bench_session_ops [--questions 50] [--rounds 20000]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import List, Optional, Set
+
+from pydantic import BaseModel, Field
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    from library.models import CurrentTestState, Difficulty, Question, QuestionRecord
+    from library.question_bank import QuestionBank
+
+    models = [
+        Question(question=f"Вопрос {i}", options=("a", "b", "c", "d"), correct_answers={i % 4 + 1})
+        for i in range(args.questions)
+    ]
+    bank = QuestionBank("bench", tuple(map(QuestionRecord.from_model, models)), 0, 0)
+
+    class LegacyState(BaseModel):
+        questions: List[Question]
+        current_index: int = 0
+        selected_answers: Set[int] = Field(default_factory=set)
+        start_time: Optional[float] = None
+        full_name: str = ""
+        specialization: str = ""
+        difficulty: Difficulty = Difficulty.BASIC
+
+    legacy = LegacyState(questions=models)
+    slotted = CurrentTestState(bank=bank, question_ids=tuple(range(args.questions)))
+
+    def toggle(state):
+        if isinstance(state, CurrentTestState):
+            return lambda: state.toggle(2)  # XOR бита маски
+        def run():
+            selected = state.selected_answers
+            if 2 in selected:
+                selected.discard(2)
+            else:
+                selected.add(2)
+            state.current_index = state.current_index  # запись атрибута, как в хэндлере
+        return run
+
+    def next_question(state):
+        n = args.questions
+        def run():
+            state.current_index = (state.current_index + 1) % n
+        return run
+
+    def finish(state):
+        if isinstance(state, CurrentTestState):
+            return state.correct_count  # Точное совпадение масок
+        def run():
+            correct = 0
+            for q in state.questions:
+                if state.selected_answers & q.correct_answers:
+                    correct += 1
+            return correct
+        return run
+
+    print(f"{args.questions} вопросов, {args.rounds} операций на замер")
+    for name, op in (("toggle", toggle), ("next", next_question), ("finish", finish)):
+        rounds = args.rounds if name != "finish" else max(1, args.rounds // 10)
+        results = {}
+        for label, state in (("pydantic", legacy), ("slotted", slotted)):
+            seconds = min(timeit.repeat(op(state), number=rounds, repeat=3))
+            results[label] = rounds / seconds
+        print(
+            f"{name:>7}: pydantic {results['pydantic']:12,.0f} оп/с | "
+            f"slotted {results['slotted']:12,.0f} оп/с | x{results['slotted'] / results['pydantic']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Локальный stub Telegram Bot API для проверки polling/webhook и нагрузочных замеров.
+Отвечает на /bot<token>/<method> правдоподобными объектами (с задержкой --latency),
+считает вызовы по методам и генерирует входящие апдейты (/start от --users пользователей):
+в polling-режиме отдаёт их через getUpdates, после setWebhook — POST'ом на webhook
+с секретом из setWebhook.
+
+Запуск:
+  python -m benchmarks.stub_telegram --port 8081 --users 50
+  TELEGRAM_API_URL=http://127.0.0.1:8081 API_TOKEN=1:stub python test_bot_main.py
+  (webhook: + BOT_MODE=webhook WEBHOOK_URL=http://127.0.0.1:8080 WEBHOOK_SECRET=s)
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import ClientSession, web
+
+logger = logging.getLogger("stub_telegram")
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Stub", "username": "stub_bot"}
+
+
+class StubTelegram:
+    """Состояние stub-сервера: счётчики, очередь апдейтов, зарегистрированный webhook."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.updates: asyncio.Queue = asyncio.Queue()
+        self.webhook_url: Optional[str] = None
+        self.webhook_secret: Optional[str] = None
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self.started = time.monotonic()
+
+    # === Bot API ===
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params: Dict[str, Any] = dict(await request.post())
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        result = await self.dispatch(method, params)
+        return web.json_response({"ok": True, "result": result})
+
+    async def dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            return await self._get_updates(float(params.get("timeout", 0)))
+        if method == "setWebhook":
+            self.webhook_url = params.get("url")
+            self.webhook_secret = params.get("secret_token")
+            asyncio.create_task(self._push_webhook())
+            return True
+        if method == "deleteWebhook":
+            self.webhook_url = None
+            return True
+        if method.startswith(("send", "edit")):
+            return self._message(params)
+        return True  # answerCallbackQuery, deleteMessage(s), ...
+
+    def _message(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chat_id = int(params.get("chat_id") or 0)
+        return {
+            "message_id": int(params.get("message_id") or next(self._message_ids)),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+
+    async def _get_updates(self, timeout: float) -> List[Dict[str, Any]]:
+        batch = []
+        try:
+            batch.append(await asyncio.wait_for(self.updates.get(), timeout=max(timeout, 0.01)))
+        except asyncio.TimeoutError:
+            return []
+        while not self.updates.empty() and len(batch) < 100:
+            batch.append(self.updates.get_nowait())
+        return batch
+
+    async def _push_webhook(self) -> None:
+        """Доставка очереди на webhook (как Telegram: повтор при не-2xx)."""
+        headers = {"X-Telegram-Bot-Api-Secret-Token": self.webhook_secret} if self.webhook_secret else {}
+        async with ClientSession() as session:
+            while self.webhook_url:
+                update = await self.updates.get()
+                for _ in range(5):
+                    async with session.post(self.webhook_url, json=update, headers=headers) as resp:
+                        if resp.status < 300:
+                            break
+                        logger.warning(f"webhook {resp.status}, повтор")
+                    await asyncio.sleep(0.5)
+
+    # === Генерация апдейтов ===
+    def push_message(self, user_id: int, text: str) -> None:
+        user = {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"}
+        self.updates.put_nowait({
+            "update_id": next(self._update_ids),
+            "message": {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": user,
+                "text": text,
+                **({"entities": [{"type": "bot_command", "offset": 0, "length": len(text)}]}
+                   if text.startswith("/") else {}),
+            },
+        })
+
+    async def stats(self, request: web.Request) -> web.Response:
+        elapsed = time.monotonic() - self.started
+        return web.json_response({
+            "calls": dict(self.calls),
+            "total": sum(self.calls.values()),
+            "per_second": round(sum(self.calls.values()) / elapsed, 1),
+            "pending_updates": self.updates.qsize(),
+            "webhook": self.webhook_url,
+        })
+
+
+async def serve(host: str, port: int, latency: float = 0.0) -> Tuple[StubTelegram, web.AppRunner]:
+    """Поднять stub в текущем loop (для бенчмарков)."""
+    stub = StubTelegram(latency)
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return stub, runner
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа API, сек")
+    parser.add_argument("--users", type=int, default=10, help="Сколько пользователей пришлют /start")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+    stub, runner = await serve(args.host, args.port, args.latency)
+    for user_id in range(1000, 1000 + args.users):
+        stub.push_message(user_id, "/start")
+    logger.info(f"Stub Bot API: http://{args.host}:{args.port} ({args.users} апдейтов в очереди)")
+    try:
+        while True:
+            await asyncio.sleep(5)
+            logger.info(f"Вызовы: {dict(stub.calls)}")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
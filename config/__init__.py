@@ -2,6 +2,6 @@
 Пакет конфигурации.
 Автоматический импорт настроек.
 """
-from .settings import settings, Settings
+from .settings import settings, Settings, prepare_runtime
 
-__all__ = ["settings", "Settings"]
+__all__ = ["settings", "Settings", "prepare_runtime"]
@@ -1,4 +1,4 @@
-'"""
+"""
 Конфигурация бота: пути, тайминги, токен из окружения.
 Production-ready для Bothost.ru: Pydantic v2, обработка ошибок, логирование.
 """
@@ -43,6 +43,81 @@ class Settings(BaseSettings):
         "продвинутый": 50
     }
     
+    # === ДОБОР ВОПРОСОВ ИЗ СОСЕДНИХ УРОВНЕЙ ===
+    # none — только свой уровень, adjacent — соседние, all — все по удалённости
+    difficulty_spillover: str = "all"
+    
+    # === КЭШ БАНКОВ ВОПРОСОВ ===
+    # Сколько секунд банк отдаётся из памяти без повторного stat() файла
+    question_bank_recheck_seconds: float = 5.0
+    # Период фоновой проверки файлов для горячей перезагрузки (0 — выключено)
+    question_bank_watch_interval: float = 10.0
+    
+    # === ДЕДЛАЙНЫ ТЕСТОВ ===
+    # Период обхода просроченных тестов (дедлайн проверяется и при каждом ответе)
+    deadline_sweep_interval: float = 15.0
+    deadline_sweep_concurrency: int = 16   # Одновременно завершаемых sweeper'ом тестов
+    deadline_sweep_timeout: float = 60.0   # Предел на завершение одного теста (сообщения + stats)
+    # Период записи активных сессий в data/sessions.db (переживают рестарт)
+    session_flush_interval: float = 2.0
+    
+    # Период строки «📊 Метрики» в лог: все компоненты, в т.ч. в polling (0 — выключено)
+    stats_log_interval: float = 300.0
+    
+    # === ЖИВОЙ ОБРАТНЫЙ ОТСЧЁТ ⏰ (опционально) ===
+    countdown_enabled: bool = False
+    countdown_round_interval: float = 10.0   # Период раунда обновлений, сек
+    countdown_edits_per_second: int = 20     # Общий бюджет правок на все чаты
+    
+    # === ПРАВКИ СООБЩЕНИЯ С ВОПРОСОМ ===
+    # Окно склейки быстрых тапов по вариантам в одну правку, сек (0 — без задержки)
+    toggle_debounce_seconds: float = 0.4
+    # Задержка пакетного удаления сообщений (deleteMessages по чату), сек
+    delete_batch_delay: float = 1.0
+    # Клавиатур теста в LRU (вопрос × маска выбранных вариантов)
+    keyboard_cache_size: int = 4096
+    
+    # === ОЧЕРЕДЬ ИСХОДЯЩИХ ЗАПРОСОВ (лимиты Telegram) ===
+    send_global_rate: float = 30.0   # Запросов/с на бота
+    send_chat_rate: float = 1.0      # Новых сообщений/с в один чат (правки и удаления не считаются)
+    send_chat_burst: int = 3         # Допустимый всплеск сообщений в чат
+    send_max_retries: int = 3        # Повторов после 429 RetryAfter
+    
+    # === АНТИСПАМ (token bucket на пользователя, сообщения + callback'и) ===
+    antispam_rate: float = 5.0           # Событий/с в среднем
+    antispam_burst: int = 5              # Допустимый всплеск
+    antispam_max_users: int = 10000      # Корзин в памяти (LRU; простаивающие — вытесняются)
+    antispam_warn_interval: float = 10.0 # Не чаще одного «не спамь» пользователю за столько секунд
+    
+    # === РЕЖИМ ПОЛУЧЕНИЯ АПДЕЙТОВ ===
+    bot_mode: str = "polling"            # polling | webhook
+    webhook_url: str = ""                # Публичный https-адрес (без пути)
+    webhook_path: str = "/webhook"
+    webhook_secret: str = ""             # X-Telegram-Bot-Api-Secret-Token (обязателен в webhook-режиме)
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    webhook_admin_host: str = "127.0.0.1"  # /healthz и /metrics — отдельный, не публичный адрес
+    webhook_admin_port: int = 8090
+    webhook_max_concurrency: int = 64    # Одновременно обрабатываемых апдейтов
+    webhook_max_pending: int = 1000      # Принятых, но не обработанных (сверх — 503)
+    # Свой Bot API сервер (локальный stub: python -m benchmarks.stub_telegram), пусто — api.telegram.org
+    telegram_api_url: str = ""
+    
+    # === HTTP-СЕССИЯ BOT API ===
+    http_pool_size: int = 100            # Соединений в пуле (все — к одному хосту)
+    http_keepalive_seconds: float = 30.0
+    http_dns_ttl: int = 3600
+    http_timeout: float = 60.0           # Таймаут по умолчанию, сек
+    http_method_timeouts: Dict[str, float] = {
+        "answerCallbackQuery": 5.0,
+        "sendMessage": 10.0,
+        "editMessageText": 10.0,
+        "editMessageReplyMarkup": 10.0,
+        "deleteMessage": 10.0,
+        "deleteMessages": 10.0,
+        "sendDocument": 60.0,
+    }
+    
     # === ПОРОГИ ОЦЕНОК ===
     grades: Dict[str, float] = {
         "неудовлетворительно": 59.0,
@@ -66,34 +141,41 @@ class Settings(BaseSettings):
     
     @validator("api_token", pre=True, always=True)
     def validate_api_token(cls, v):
-        """Валидация API токена с поддержкой переменных окружения."""
-        token = v or os.getenv("API_TOKEN", "").strip()
-        
-        if not token:
-            error_msg = (
-                "❌ ОШИБКА: API_TOKEN не установлен!\n"
-                "Убедитесь, что переменная окружения API_TOKEN установлена на Bothost.ru"
-            )
-            print(error_msg, file=sys.stderr)
-            if os.getenv("ENVIRONMENT") == "production":
-                raise ValueError(error_msg)
-            # В разработке используем пустой токен с предупреждением
-            logging.warning("API_TOKEN не найден - используется пустой токен (только для разработки)")
-        
-        return token
+        """API токен из окружения; наличие проверяет validate_environment() при запуске, не импорт."""
+        return (v or os.getenv("API_TOKEN", "")).strip()
     
     @validator("environment", pre=True, always=True)
     def validate_environment(cls, v):
         """Установка окружения из переменной окружения."""
         return (v or os.getenv("ENVIRONMENT", "production")).lower()
+    
+    @validator("bot_mode")
+    def validate_bot_mode(cls, v):
+        """Режим: polling (по умолчанию) или webhook."""
+        v = v.lower()
+        if v not in ("polling", "webhook"):
+            raise ValueError("bot_mode: polling или webhook")
+        return v
+    
+    @validator("webhook_path")
+    def validate_webhook_path(cls, v):
+        return v if v.startswith("/") else f"/{v}"
+    
+    @validator("difficulty_spillover")
+    def validate_difficulty_spillover(cls, v):
+        """Политика добора: none / adjacent / all."""
+        v = v.lower()
+        if v not in ("none", "adjacent", "all"):
+            raise ValueError("difficulty_spillover: none, adjacent или all")
+        return v
 
 
-# === ИНИЦИАЛИЗАЦИЯ И СОЗДАНИЕ ДИРЕКТОРИЙ ===
+# === ГЛОБАЛЬНЫЙ ЭКЗЕМПЛЯР (без побочных эффектов) ===
 settings = Settings()
 logger = logging.getLogger(__name__)
 
-def setup_logging():
-    """Настройка логирования с поддержкой Bothost.ru."""
+def setup_logging(to_file: bool = True):
+    """Настройка логирования с поддержкой Bothost.ru (to_file=False — только консоль, для утилит)."""
     log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
     
     # Базовая конфигурация для консоли (всегда активна)
@@ -104,7 +186,7 @@ def setup_logging():
     )
     
     # Логирование в файл (если разрешено и возможно)
-    if settings.use_file_logging:
+    if settings.use_file_logging and to_file:
         try:
             file_handler = logging.FileHandler(
                 settings.logs_dir / "bot.log",
@@ -168,10 +250,14 @@ def validate_environment():
     
     # Проверка критических параметров
     if not settings.api_token:
-        error_msg = "❌ Критическая ошибка: API_TOKEN не установлен"
+        error_msg = (
+            "❌ Критическая ошибка: API_TOKEN не установлен. "
+            "Убедитесь, что переменная окружения API_TOKEN установлена на Bothost.ru"
+        )
         logger.error(error_msg)
         if settings.environment == "production":
             raise ValueError(error_msg)
+        logger.warning("API_TOKEN не найден - используется пустой токен (только для разработки)")
     
     # Проверка структуры данных
     if not settings.specializations or len(settings.specializations) != 11:
@@ -179,16 +265,34 @@ def validate_environment():
             f"⚠️ Ожидается 11 специализаций, найдено: {len(settings.specializations)}"
         )
     
+    if settings.bot_mode == "webhook" and not settings.webhook_url:
+        error_msg = "❌ BOT_MODE=webhook требует WEBHOOK_URL"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    if settings.bot_mode == "webhook" and not settings.webhook_secret:
+        error_msg = "❌ BOT_MODE=webhook требует WEBHOOK_SECRET: иначе апдейт подделает любой"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    
     logger.info("✅ Конфигурация валидна")
 
 
-# === ИНИЦИАЛИЗАЦИЯ ПРИ ИМПОРТЕ ===
-try:
-    setup_logging()
-    ensure_directories_exist()
-    validate_environment()
-    logger.info("✅ Бот готов к запуску")
-except Exception as e:
-    logger.critical(f"❌ Критическая ошибка при инициализации: {e}")
-    if settings.environment == "production":
-        raise
+# === ИНИЦИАЛИЗАЦИЯ ПРИ ЗАПУСКЕ (не при импорте) ===
+def prepare_runtime(require_token: bool = True):
+    """
+    Каталоги, логирование, проверка окружения — первый шаг library.bootstrap.
+    Импорт модуля только читает окружение: тесты, бенчмарки и утилиты не трогают ФС.
+    require_token=False — для офлайн-утилит (bank_compiler, regrade): только каталоги
+    и консольный лог, без проверки токена/webhook и без записи в logs/bot.log бота.
+    """
+    try:
+        ensure_directories_exist()  # До логирования: logs/ нужен файловому хендлеру
+        setup_logging(to_file=require_token)
+        if not require_token:
+            return
+        validate_environment()
+        logger.info("✅ Бот готов к запуску")
+    except Exception as e:
+        logger.critical(f"❌ Критическая ошибка при инициализации: {e}")
+        if settings.environment == "production":
+            raise
@@ -1,50 +1,57 @@
 """
-library/__init__.py: Все импорты + middlewares.
+library/__init__.py: публичные имена пакета + middlewares.
 Production: expose для test_bot_main/specializations.
+Импорт ленивый (PEP 562): `from library import X` загружает только модуль с X.
+Экземпляры, названные как свой модуль (bank_watcher, session_store, edit_debouncer),
+не реэкспортируются — импортируйте из подмодуля: `from library.bank_watcher import bank_watcher`.
 """
-from typing import Optional
-import asyncio
-import logging
-
-logger = logging.getLogger(__name__)
-
-# Core models/states/timer
-from .models import Question, CurrentTestState, Difficulty, TestStates
-from .question_loader import load_questions_for_specialization
-from .timers import TestTimer, create_timer
-from .library import (  # Core logic
-    _show_question, handle_answer_toggle, handle_next_question, finish_test
-)
-
-# Keyboards lazy
-def get_main_keyboard(): from .keyboards import get_main_keyboard; return get_main_keyboard()
-def get_difficulty_keyboard(): from .keyboards import get_difficulty_keyboard; return get_difficulty_keyboard()
-def get_test_keyboard(options, selected): from .keyboards import get_test_keyboard; return get_test_keyboard(options, selected)
-def get_finish_keyboard(): from .keyboards import get_finish_keyboard; return get_finish_keyboard()
-
-# Fallbacks
-def safe_timer_remaining(timer): 
-    try: return timer.remaining_time() if hasattr(timer, 'remaining_time') else "∞"
-    except: return "∞"
-
-def safe_timer_stop(timer):
-    try: getattr(timer, 'stop', lambda: None)()
-    except: pass
-
-# Middlewares
-from .middlewares import AntiSpamMiddleware, ErrorHandlerMiddleware
-
-# AntiSpam stub (legacy, используй middlewares)
-class AntiSpamMiddleware:
-    async def __call__(self, handler, event, data):
-        from .middlewares import AntiSpamMiddleware as Real
-        return await Real()(handler, event, data)
-
-__all__ = [
-    "TestStates", "Difficulty", "Question", "CurrentTestState",
-    "load_questions_for_specialization", "create_timer",
-    "get_main_keyboard", "get_difficulty_keyboard", "get_test_keyboard", "get_finish_keyboard",
-    "_show_question", "handle_answer_toggle", "handle_next_question", "finish_test",
-    "safe_timer_remaining", "safe_timer_stop",
-    "AntiSpamMiddleware", "ErrorHandlerMiddleware"
-]
+from importlib import import_module
+from typing import Any
+
+# Имя → модуль пакета
+_EXPORTS = {
+    # Core models/states/loader
+    "Question": ".models", "QuestionRecord": ".models", "CurrentTestState": ".models",
+    "Difficulty": ".models", "UserData": ".models",
+    "TestStates": ".states",
+    "load_questions_for_specialization": ".question_loader", "load_questions_async": ".question_loader",
+    "draw_questions_async": ".question_loader", "get_bank_async": ".question_loader",
+    "QuestionBank": ".question_bank", "question_bank_cache": ".question_bank",
+    "QuestionBankWatcher": ".bank_watcher",
+    # Сессии и дедлайны
+    "SessionStore": ".session_store",
+    "SessionRegistry": ".sessions", "active_sessions": ".sessions",
+    # Core logic
+    "_show_question": ".library", "render_question": ".library", "show_first_question": ".library",
+    "handle_answer_toggle": ".library", "handle_next_question": ".library",
+    "finish_test": ".library", "handle_timeout": ".library",
+    "CountdownRefresher": ".countdown", "countdown_refresher": ".countdown",
+    "EditDebouncer": ".edit_debouncer",
+    "MessageDeleter": ".message_cleanup", "message_deleter": ".message_cleanup",
+    "Priority": ".send_queue", "SendScheduler": ".send_queue", "send_scheduler": ".send_queue",
+    "send_priority": ".send_queue", "mark_background": ".send_queue",
+    # Keyboards (статичные — один раз, тестовые — LRU)
+    "get_main_keyboard": ".keyboards", "get_specializations_keyboard": ".keyboards",
+    "get_difficulty_keyboard": ".keyboards", "get_test_keyboard": ".keyboards", "get_finish_keyboard": ".keyboards",
+    # Запуск и метрики
+    "bootstrap": ".startup",
+    "collect_stats": ".metrics", "StatsReporter": ".metrics", "stats_reporter": ".metrics",
+    # Middlewares (антиспам — один общий экземпляр)
+    "AntiSpamMiddleware": ".middlewares", "anti_spam": ".middlewares", "ErrorHandlerMiddleware": ".middlewares",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # Следующие обращения — без __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
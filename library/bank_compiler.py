@@ -0,0 +1,112 @@
+"""
+Офлайн-компиляция банков вопросов: questions/<spec>.json → questions/<spec>.qbank.
+Артефакт — pickle уже провалидированных вопросов, загрузка без pydantic-валидации.
+В артефакте — mtime_ns/size исходного JSON: артефакт годен, только пока они совпадают.
+Запуск: python -m library.bank_compiler [spec ...]  (по умолчанию все специализации).
+"""
+import logging
+import pickle
+import sys
+from pathlib import Path
+from typing import Optional
+
+from config.settings import settings, prepare_runtime
+from .models import QuestionRecord, Difficulty
+from .question_bank import QuestionBank, load_bank_file
+
+logger = logging.getLogger(__name__)
+
+BANK_FORMAT_VERSION = 3  # 2: difficulty из JSON, 3: подпись исходного JSON
+COMPILED_SUFFIX = ".qbank"
+
+_DIFFICULTY_BY_VALUE = {d.value: d for d in Difficulty}
+
+
+def compiled_path_for(json_path: Path) -> Path:
+    """Путь артефакта рядом с исходным JSON."""
+    return json_path.with_suffix(COMPILED_SUFFIX)
+
+
+def compile_bank(specialization: str, json_path: Optional[Path] = None) -> Optional[Path]:
+    """JSON → провалидированный .qbank. None, если JSON не читается."""
+    json_path = json_path or settings.questions_dir / f"{specialization}.json"
+    bank = load_bank_file(specialization, json_path)
+    if bank is None:
+        return None
+
+    payload = {
+        "version": BANK_FORMAT_VERSION,
+        "specialization": specialization,
+        "source": (bank.mtime_ns, bank.size),  # Подпись JSON, из которого собран артефакт
+        "rejected": bank.rejected,
+        "questions": [
+            (q.question, list(q.options), sorted(q.correct_answers), q.difficulty.value)
+            for q in bank.questions
+        ],
+    }
+    out_path = compiled_path_for(json_path)
+    tmp_path = out_path.with_suffix(COMPILED_SUFFIX + ".tmp")
+    with tmp_path.open("wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(out_path)  # Атомарно: loader не увидит недописанный файл
+
+    logger.info(f"Скомпилирован {specialization}: {len(bank.questions)} вопросов → {out_path.name}")
+    return out_path
+
+
+def load_compiled_bank(
+    specialization: str,
+    compiled_path: Path,
+    mtime_ns: int,
+    size: int
+) -> Optional[QuestionBank]:
+    """
+    Загрузка .qbank без повторной валидации.
+    mtime_ns/size — текущие у исходного JSON: артефакт от другой версии → None.
+    Формат доверенный: файлы пишет только compile_bank.
+    """
+    try:
+        with compiled_path.open("rb") as f:
+            payload = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+        logger.warning(f"Битый артефакт {compiled_path.name}: {e}")
+        return None
+
+    if payload.get("version") != BANK_FORMAT_VERSION:
+        logger.warning(f"Устаревший формат {compiled_path.name}: {payload.get('version')}")
+        return None
+    if tuple(payload.get("source", ())) != (mtime_ns, size):
+        logger.info(f"{compiled_path.name} собран из другой версии JSON — читаем JSON")
+        return None
+
+    questions = tuple(
+        QuestionRecord(
+            sys.intern(text),
+            tuple(map(sys.intern, options)),
+            frozenset(correct),
+            _DIFFICULTY_BY_VALUE[difficulty]
+        )
+        for text, options, correct, difficulty in payload["questions"]
+    )
+    return QuestionBank(
+        specialization=specialization,
+        questions=questions,
+        mtime_ns=mtime_ns,
+        size=size,
+        rejected=payload.get("rejected", 0),
+    )
+
+
+def main(argv: list[str]) -> int:
+    """CLI: компиляция указанных (или всех) специализаций."""
+    prepare_runtime(require_token=False)  # Офлайн-утилита: токен бота не нужен
+    specs = argv or settings.specializations
+    failed = [spec for spec in specs if compile_bank(spec) is None]
+    if failed:
+        logger.error(f"Не скомпилированы: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,95 @@
+"""
+Горячая перезагрузка банков вопросов без рестарта бота.
+Фоновая задача раз в question_bank_watch_interval проверяет файлы,
+валидирует изменённые в пуле потоков и атомарно подменяет банк в кэше.
+Идущие тесты держат старые объекты вопросов по ссылке и не замечают подмены.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from config.settings import settings
+from .question_bank import QuestionBankCache, question_bank_cache
+from .question_loader import _LOAD_EXECUTOR
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionBankWatcher:
+    """Watcher файлов банков + метрики подмен."""
+
+    def __init__(self, cache: QuestionBankCache = question_bank_cache, interval: Optional[float] = None):
+        self.cache = cache
+        self.interval = settings.question_bank_watch_interval if interval is None else interval
+        self._task: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, float] = {
+            "swaps": 0,
+            "rejected_reloads": 0,      # Файл не прошёл валидацию — остался старый банк
+            "rejected_questions": 0,    # Вопросы, отброшенные валидацией при подменах
+            "last_swap_seconds": 0.0,   # Чтение + валидация + swap последней подмены
+            "max_swap_seconds": 0.0,
+        }
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="question-bank-watcher")
+        logger.info(f"✅ Watcher банков вопросов: каждые {self.interval:.0f} сек")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check_once()
+            except Exception as e:
+                logger.error(f"Watcher банков: {e}", exc_info=True)
+
+    async def check_once(self) -> int:
+        """Один проход: перезагрузить изменённые банки. Возвращает число подмен."""
+        loop = asyncio.get_running_loop()
+        stale = await loop.run_in_executor(_LOAD_EXECUTOR, self.cache.stale_specializations)
+        swapped = 0
+        for specialization in stale:
+            if await self._reload(loop, specialization):
+                swapped += 1
+        return swapped
+
+    async def _reload(self, loop: asyncio.AbstractEventLoop, specialization: str) -> bool:
+        started = time.perf_counter()
+        bank = await loop.run_in_executor(_LOAD_EXECUTOR, self.cache.build, specialization)
+
+        if bank is None:
+            self.metrics["rejected_reloads"] += 1
+            logger.error(f"❌ Банк {specialization} не прошёл валидацию — остаётся прежняя версия")
+            return False
+
+        old = self.cache.swap(specialization, bank)
+        elapsed = time.perf_counter() - started
+        self.metrics["swaps"] += 1
+        self.metrics["rejected_questions"] += bank.rejected
+        self.metrics["last_swap_seconds"] = elapsed
+        self.metrics["max_swap_seconds"] = max(self.metrics["max_swap_seconds"], elapsed)
+        logger.info(
+            f"🔄 Банк {specialization} перезагружен: "
+            f"{len(old.questions) if old else 0} → {len(bank.questions)} вопросов, "
+            f"отброшено {bank.rejected}, {elapsed * 1000:.1f} мс"
+        )
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        return dict(self.metrics)
+
+
+# Глобальный экземпляр
+bank_watcher = QuestionBankWatcher()
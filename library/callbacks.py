@@ -0,0 +1,120 @@
+"""
+Callback data кнопок теста: компактная версионированная кодировка.
+Формат: <версия><действие><поля через "."> — только ASCII, числа в base36:
+  "1s3"    специализация settings.specializations[3]
+  "1d1"    сложность DIFFICULTIES[1]
+  "1a4.2"  вариант 2 вопроса с индексом 4
+  "1n4"    «Далее» с вопроса 4
+Строка разбирается один раз на апдейт (decode), маршрут — dict действие → хэндлер
+(specializations/engine.py). Номер вопроса в кнопке отсекает тапы по клавиатурам
+уже пройденных вопросов. Коды — позиции в списках: при их изменении поднять VERSION.
+"""
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from config.settings import settings
+from .enum import Difficulty
+
+VERSION = "1"
+SEP = "."
+
+START = "s"
+DIFFICULTY = "d"
+ANSWER = "a"
+NEXT = "n"
+
+# Поля действия в порядке записи
+SCHEMA: Dict[str, Tuple[str, ...]] = {
+    START: ("spec",),
+    DIFFICULTY: ("difficulty",),
+    ANSWER: ("question", "option"),
+    NEXT: ("question",),
+}
+
+SPECIALIZATIONS: Tuple[str, ...] = tuple(settings.specializations)
+DIFFICULTIES: Tuple[Difficulty, ...] = tuple(Difficulty)
+_SPEC_CODES = {spec: code for code, spec in enumerate(SPECIALIZATIONS)}
+_DIFFICULTY_CODES = {diff: code for code, diff in enumerate(DIFFICULTIES)}
+
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+class CallbackPayload(NamedTuple):
+    """Разобранная кнопка; незаданные поля — -1."""
+    action: str
+    spec: int = -1
+    difficulty: int = -1
+    question: int = -1
+    option: int = -1
+
+    @property
+    def specialization(self) -> Optional[str]:
+        return SPECIALIZATIONS[self.spec] if 0 <= self.spec < len(SPECIALIZATIONS) else None
+
+    @property
+    def level(self) -> Optional[Difficulty]:
+        return DIFFICULTIES[self.difficulty] if 0 <= self.difficulty < len(DIFFICULTIES) else None
+
+
+def _b36(value: int) -> str:
+    if value < 36:
+        return _DIGITS[value]
+    digits = ""
+    while value:
+        value, rem = divmod(value, 36)
+        digits = _DIGITS[rem] + digits
+    return digits
+
+
+def encode(action: str, *values: int) -> str:
+    """Значения — в порядке SCHEMA[action]."""
+    return VERSION + action + SEP.join(map(_b36, values))
+
+
+# Действие → позиции его полей в CallbackPayload (без action)
+_SLOTS = {
+    action: tuple(CallbackPayload._fields.index(name) - 1 for name in names)
+    for action, names in SCHEMA.items()
+}
+
+
+@lru_cache(maxsize=4096)
+def decode(data: str) -> Optional[CallbackPayload]:
+    """'1a4.2' → CallbackPayload('a', question=4, option=2); чужое/другой версии → None.
+    Кнопок конечное число (специализации × сложности × вопросы × варианты) — результат кэшируется."""
+    if data[:1] != VERSION:
+        return None
+    slots = _SLOTS.get(data[1:2])
+    if slots is None:
+        return None
+    raw = data[2:].split(SEP)
+    if len(raw) != len(slots):
+        return None
+    values = [-1, -1, -1, -1]
+    for slot, part in zip(slots, raw):
+        if not (part.isascii() and part.isalnum()):
+            return None
+        values[slot] = int(part, 36)
+    return CallbackPayload(data[1], *values)
+
+
+def is_stale(data: str) -> bool:
+    """Наша кнопка, но другой версии кодировки (клавиатура из старого сообщения)."""
+    return data[:1].isdigit() and data[:1] != VERSION
+
+
+# === Конструкторы для клавиатур ===
+def start(spec: str) -> str:
+    return encode(START, _SPEC_CODES[spec])
+
+
+def difficulty(level: Difficulty) -> str:
+    return encode(DIFFICULTY, _DIFFICULTY_CODES[level])
+
+
+def answer(question: int, option: int) -> str:
+    return encode(ANSWER, question, option)
+
+
+def next_question(question: int) -> str:
+    return encode(NEXT, question)
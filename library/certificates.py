@@ -4,6 +4,7 @@
 """
 from pathlib import Path
 from datetime import datetime
+from functools import cache
 from typing import Optional
 
 from reportlab.lib.pagesizes import A4
@@ -17,6 +18,19 @@ from reportlab.pdfbase.ttfonts import TTFont
 from config.settings import settings
 from .models import TestResult
 
+# Кириллический шрифт (если есть в системе, иначе Helvetica)
+FONT_NAME = 'DejaVuSans'
+FONT_PATH = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+
+@cache
+def register_fonts() -> str:
+    """Регистрация шрифта в ReportLab (разбор TTF — один раз на процесс). Возвращает имя шрифта."""
+    try:
+        pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_PATH))
+        return FONT_NAME
+    except Exception:
+        return 'Helvetica'
+
 async def generate_certificate(result: TestResult, bot_username: str) -> Path:
     """
     Генерирует PDF‑сертификат.
@@ -39,12 +53,7 @@ async def generate_certificate(result: TestResult, bot_username: str) -> Path:
         alignment=1  # Центр
     )
     
-    # Русский шрифт (если есть в системе, иначе Courier)
-    try:
-        pdfmetrics.registerFont(TTFont('DejaVuSans', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'))
-        font_name = 'DejaVuSans'
-    except:
-        font_name = 'Helvetica'
+    font_name = register_fonts()  # Обычно уже зарегистрирован прогревом (library.startup)
     
     # Заголовок
     story.append(Paragraph("СЕРТИФИКАТ<br/><br/>о прохождении тестирования", title_style))
@@ -0,0 +1,118 @@
+"""
+Живой обратный отсчёт ⏰ в сообщении с вопросом (включается settings.countdown_enabled).
+Раз в countdown_round_interval собирает сессии, у которых сменилась показанная минута,
+и правит их сообщения пачками в пределах общего бюджета правок в секунду:
+не больше countdown_edits_per_second на все чаты, остальное — в следующую секунду.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+
+from config.settings import settings
+from .library import render_question
+from .models import CurrentTestState
+from .send_queue import mark_background
+from .sessions import SessionRegistry, active_sessions
+
+logger = logging.getLogger(__name__)
+
+
+class CountdownRefresher:
+    """Раунды правок ⏰ с глобальным лимитом + метрики."""
+
+    def __init__(
+        self,
+        registry: SessionRegistry = active_sessions,
+        interval: Optional[float] = None,
+        edits_per_second: Optional[int] = None
+    ):
+        self.registry = registry
+        self.interval = interval or settings.countdown_round_interval
+        self.edits_per_second = max(1, edits_per_second or settings.countdown_edits_per_second)
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, float] = {
+            "rounds": 0,
+            "edits_sent": 0,
+            "edits_skipped": 0,     # Минута на экране не сменилась — правка не нужна
+            "edits_failed": 0,      # Сообщение удалено/не изменено/ошибка API
+            "last_round_seconds": 0.0,
+        }
+
+    def start(self, bot: Bot) -> None:
+        if not settings.countdown_enabled or self._task is not None:
+            return
+        self._bot = bot
+        self._task = asyncio.create_task(self._run(), name="countdown-refresher")
+        logger.info(
+            f"⏰ Обратный отсчёт: раунд каждые {self.interval:g} с, "
+            f"до {self.edits_per_second} правок/с"
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        mark_background()  # Правки ⏰ уступают ответам пользователям
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh_once()
+            except Exception as e:
+                logger.error(f"Обратный отсчёт: {e}", exc_info=True)
+
+    def collect_due(self) -> List[CurrentTestState]:
+        """Сессии, которым нужна правка (минута на экране устарела)."""
+        due = []
+        for test_state in list(self.registry.sessions.values()):
+            if not test_state.message_id or test_state.is_expired():
+                continue  # Вопрос ещё не показан / истёкшие завершит sweeper
+            if test_state.minutes_left() == test_state.shown_minute:
+                self.metrics["edits_skipped"] += 1
+                continue
+            due.append(test_state)
+        return due
+
+    async def refresh_once(self) -> int:
+        """Один раунд: правки пачками по edits_per_second, пачка — не чаще раза в секунду."""
+        started = time.monotonic()
+        due = self.collect_due()
+        for i in range(0, len(due), self.edits_per_second):
+            batch_started = time.monotonic()
+            await asyncio.gather(*(self._edit(s) for s in due[i:i + self.edits_per_second]))
+            if i + self.edits_per_second < len(due):
+                await asyncio.sleep(max(0.0, 1.0 - (time.monotonic() - batch_started)))
+        self.metrics["rounds"] += 1
+        self.metrics["last_round_seconds"] = time.monotonic() - started
+        return len(due)
+
+    async def _edit(self, test_state: CurrentTestState) -> None:
+        if self.registry.get(test_state.user_id) is not test_state:
+            return  # Тест завершился, пока ждали бюджет
+        text, keyboard = render_question(test_state)
+        try:
+            await self._bot.edit_message_text(
+                text, chat_id=test_state.chat_id, message_id=test_state.message_id, reply_markup=keyboard
+            )
+            self.metrics["edits_sent"] += 1
+        except TelegramBadRequest as e:
+            self.metrics["edits_failed"] += 1
+            logger.debug(f"Countdown edit {test_state.user_id}: {e}")
+        except Exception as e:
+            self.metrics["edits_failed"] += 1
+            logger.warning(f"Countdown edit {test_state.user_id}: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        return dict(self.metrics)
+
+
+# Глобальный экземпляр
+countdown_refresher = CountdownRefresher()
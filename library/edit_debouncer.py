@@ -0,0 +1,70 @@
+"""
+Склейка быстрых переключений ответа в одну правку сообщения.
+Состояние меняется сразу, правка откладывается на toggle_debounce_seconds;
+новый тап по тому же сообщению отменяет и ожидающую, и уже отправляемую правку —
+уходит только последняя клавиатура.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+from aiogram.exceptions import TelegramBadRequest
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EditDebouncer:
+    """Одна отложенная правка на ключ (chat_id, message_id)."""
+
+    def __init__(self, window: Optional[float] = None):
+        self.window = settings.toggle_debounce_seconds if window is None else window
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+        self.metrics: Dict[str, int] = {
+            "scheduled": 0,
+            "superseded": 0,    # Правки, вытесненные более новым тапом
+            "sent": 0,
+            "failed": 0,
+        }
+
+    def schedule(self, key: Hashable, edit: Callable[[], Awaitable]) -> None:
+        """Поставить правку: edit() вызовется через window, если не придёт новая."""
+        if self.cancel(key):
+            self.metrics["superseded"] += 1
+        self.metrics["scheduled"] += 1
+        self._pending[key] = asyncio.create_task(self._fire(key, edit))
+
+    def cancel(self, key: Hashable) -> bool:
+        """Отменить отложенную/идущую правку (сообщение удалено или перерисовано)."""
+        task = self._pending.pop(key, None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def _fire(self, key: Hashable, edit: Callable[[], Awaitable]) -> None:
+        try:
+            if self.window > 0:
+                await asyncio.sleep(self.window)
+            await edit()
+            self.metrics["sent"] += 1
+        except asyncio.CancelledError:
+            raise
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                self.metrics["failed"] += 1
+                logger.warning(f"Toggle edit {key}: {e}")
+        except Exception as e:
+            self.metrics["failed"] += 1
+            logger.error(f"Toggle edit {key}: {e}")
+        finally:
+            if self._pending.get(key) is asyncio.current_task():
+                del self._pending[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.metrics, "pending": len(self._pending)}
+
+
+# Глобальный экземпляр
+edit_debouncer = EditDebouncer()
@@ -0,0 +1,126 @@
+"""
+HTTP-сессия бота: настроенный пул соединений aiohttp + гистограммы задержек по методам API.
+Пул (http_pool_size), keep-alive, DNS-кэш и таймауты по методам — из settings;
+задержка каждого вызова (включая ошибки) пишется в гистограмму его метода.
+"""
+import bisect
+import logging
+import time
+from typing import Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.methods import TelegramMethod
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин, секунды (последняя — всё, что дольше)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class LatencyHistogram:
+    """Гистограмма с фиксированными корзинами: O(log k) на наблюдение, без хранения сэмплов."""
+    __slots__ = ("counts", "total", "count", "errors")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.errors += error
+
+    def quantile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает квантиль q."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p99_ms": self.quantile(0.99) * 1000,
+        }
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """AiohttpSession с явным пулом, keep-alive, DNS-кэшем, таймаутами по методам и метриками."""
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        keepalive: Optional[float] = None,
+        dns_ttl: Optional[int] = None,
+        method_timeouts: Optional[Dict[str, float]] = None,
+        **kwargs
+    ):
+        if api_url:
+            kwargs["api"] = TelegramAPIServer.from_base(api_url)
+        kwargs.setdefault("timeout", settings.http_timeout)
+        pool_size = pool_size or settings.http_pool_size
+        super().__init__(limit=pool_size, **kwargs)
+        self._connector_init.update(
+            limit=pool_size,
+            limit_per_host=pool_size,  # Все запросы идут на один хост api.telegram.org
+            keepalive_timeout=settings.http_keepalive_seconds if keepalive is None else keepalive,
+            ttl_dns_cache=dns_ttl or settings.http_dns_ttl,
+        )
+        self.method_timeouts = settings.http_method_timeouts if method_timeouts is None else method_timeouts
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None):
+        name = method.__api_method__
+        if timeout is None:
+            timeout = self.method_timeouts.get(name)  # getUpdates передаёт свой таймаут явно
+        started = time.perf_counter()
+        error = True
+        try:
+            result = await super().make_request(bot, method, timeout)
+            error = False
+            return result
+        finally:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.observe(time.perf_counter() - started, error)
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: h.summary() for name, h in sorted(self.histograms.items())}
+
+    def prometheus_text(self) -> str:
+        """Гистограммы в формате Prometheus (text exposition)."""
+        lines: List[str] = [
+            "# HELP telegram_api_request_seconds Bot API request latency by method",
+            "# TYPE telegram_api_request_seconds histogram",
+        ]
+        for name, h in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, h.counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'telegram_api_request_seconds_bucket{{method="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'telegram_api_request_seconds_sum{{method="{name}"}} {h.total:.6f}')
+            lines.append(f'telegram_api_request_seconds_count{{method="{name}"}} {h.count}')
+            lines.append(f'telegram_api_request_errors_total{{method="{name}"}} {h.errors}')
+        return "\n".join(lines) + "\n"
+
+
+def create_bot_session(**kwargs) -> TunedAiohttpSession:
+    """Сессия по settings (telegram_api_url — локальный stub/свой Bot API сервер)."""
+    return TunedAiohttpSession(api_url=settings.telegram_api_url or None, **kwargs)
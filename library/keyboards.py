@@ -1,11 +1,17 @@
 """
 Общие клавиатуры: главное меню, уровни сложности, тест, результаты.
+Статичные строятся один раз; клавиатуры теста — из LRU по (варианты, маска, номер вопроса).
+Callback data — library.callbacks.
+Разметки общие для всех вызовов: не изменяйте возвращённые объекты.
 """
+from functools import cache, lru_cache
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
+from . import callbacks
 from .models import Difficulty
 from config.settings import settings
 
+@cache
 def get_main_keyboard() -> ReplyKeyboardMarkup:
     """Главное меню: 11 специализаций + Помощь."""
     builder = ReplyKeyboardBuilder()
@@ -32,32 +38,63 @@ def get_main_keyboard() -> ReplyKeyboardMarkup:
     
     return builder.as_markup(resize_keyboard=True, one_time_keyboard=False)
 
+# Кнопки /start: специализация → подпись (порядок — settings.specializations)
+SPECIALIZATION_TITLES = {
+    "oupds": "🚨 ООУПДС",
+    "ispolniteli": "📊 Исполнители",
+    "aliment": "💰 Алименты",
+    "doznanie": "🎯 Дознание",
+    "rozyisk": "🔍 Розыск",
+    "prof": "📚 Профстандарты",
+    "oko": "👁️ ОКО",
+    "informatika": "💻 Информатизация",
+    "kadry": "👥 Кадры",
+    "bezopasnost": "🛡️ Безопасность",
+    "upravlenie": "🏛️ Управление",
+}
+
+@cache
+def get_specializations_keyboard() -> InlineKeyboardMarkup:
+    """Выбор специализации (/start)."""
+    builder = InlineKeyboardBuilder()
+    for spec in settings.specializations:
+        builder.button(text=SPECIALIZATION_TITLES.get(spec, spec), callback_data=callbacks.start(spec))
+    builder.adjust(1)
+    return builder.as_markup()
+
+@cache
 def get_difficulty_keyboard() -> InlineKeyboardMarkup:
     """Выбор уровня сложности."""
     builder = InlineKeyboardBuilder()
     for diff in Difficulty:
-        builder.button(text=diff.value.capitalize(), callback_data=f"diff_{diff.value}")
+        builder.button(text=diff.value.capitalize(), callback_data=callbacks.difficulty(diff))
     builder.adjust(1)
     return builder.as_markup()
 
-def get_test_keyboard(options: list[str], selected: set[int] | None = None) -> InlineKeyboardMarkup:
-    """Toggle: 1️⃣2️⃣3️⃣4️⃣5️⃣✅ номера, 2 колонки, ➡️ всегда."""
+def get_test_keyboard(options: tuple[str, ...], selected_mask: int = 0, question: int = 0) -> InlineKeyboardMarkup:
+    """Toggle: 1️⃣2️⃣3️⃣4️⃣5️⃣✅ номера, 2 колонки, ➡️ всегда. selected_mask: бит N-1 = вариант N.
+    question — индекс вопроса в сессии, зашивается в callback data кнопок."""
+    # Варианты QuestionRecord — кортеж, общий для всех сессий: это и есть ключ вопроса
+    return _build_test_keyboard(tuple(options), selected_mask, question)
+
+@lru_cache(maxsize=settings.keyboard_cache_size)
+def _build_test_keyboard(options: tuple[str, ...], selected_mask: int, question: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    selected = selected or set()
     
     for i, opt_text in enumerate(options):  # opt_text только для info
         num = i + 1  # 1-based
-        state = "✅" if num in selected else ""
+        state = "✅" if selected_mask >> i & 1 else ""
         button_text = f"{state}{num}️⃣ {opt_text[:50]}"  # ✅ Цифры + укороченный текст
         builder.button(
             text=button_text,
-            callback_data=f"ans_{num}"
+            callback_data=callbacks.answer(question, num)
         )
     
-    builder.button(text="➡️ Далее", callback_data="next").adjust(1)
+    builder.button(text="➡️ Далее", callback_data=callbacks.next_question(question)).adjust(1)
     builder.adjust(2)  # 2 колонки
     return builder.as_markup()
 
+@cache
 def get_finish_keyboard() -> InlineKeyboardMarkup:
     """После теста: показать ответы, сертификат, повторить, статистика."""
     builder = InlineKeyboardBuilder()
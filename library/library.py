@@ -6,84 +6,152 @@ Production: delete messages, stats, PDF stub, fallbacks.
 import asyncio
 import logging
 from typing import Optional
-from aiogram.types import CallbackQuery, Message, FSInputFile
+from aiogram import Bot
+from aiogram.types import CallbackQuery, Message, FSInputFile, InlineKeyboardMarkup
 from aiogram.fsm.context import FSMContext
 
 from config.settings import settings
-from .models import CurrentTestState
-from . import safe_timer_remaining, safe_timer_stop, get_test_keyboard, get_finish_keyboard
-from .timers import TestTimer  # Предполагаем следующий файл
+from .models import CurrentTestState, TestResult, UserData
+from .results import grade_for_percentage
+from .stats import stats_manager
+from .keyboards import get_test_keyboard, get_finish_keyboard
+from .sessions import active_sessions
+from .edit_debouncer import edit_debouncer
+from .message_cleanup import message_deleter
 
 logger = logging.getLogger(__name__)
 
+def render_question(test_state: CurrentTestState) -> tuple[str, InlineKeyboardMarkup]:
+    """Текст (⏰ + вопрос N/M) и клавиатура текущего вопроса."""
+    question_obj = test_state.current_question()
+    test_state.shown_minute = test_state.minutes_left()
+    
+    # ⏰ + вопрос 1/20; с обратным отсчётом — в минутах: правки идут раз в минуту
+    time_left = test_state.time_left_text(minutes_only=settings.countdown_enabled)
+    header = f"⏰ {time_left}\n\nВопрос {test_state.current_index + 1}/{len(test_state.question_ids)}:"
+    full_text = f"{header}\n\n{question_obj.question}"
+    
+    keyboard = get_test_keyboard(question_obj.options, test_state.selected_mask, test_state.current_index)
+    return full_text, keyboard
+
 async def _show_question(
-    question_obj: 'Question', 
+    question_obj: 'QuestionRecord', 
     test_state: CurrentTestState, 
     message: Message | CallbackQuery
 ) -> None:
     """Показ вопроса: нумер текст, ⏰, клавиатура."""
     msg = message if isinstance(message, Message) else message.message
     
-    # ⏰ + вопрос 1/20
-    time_left = safe_timer_remaining(test_state.timer_task)
-    header = f"⏰ {time_left}\n\nВопрос {test_state.current_index + 1}/{len(test_state.questions)}:"
-    full_text = f"{header}\n\n{question_obj.question}"
-    
-    keyboard = get_test_keyboard(question_obj.options, test_state.selected_answers)
+    full_text, keyboard = render_question(test_state)
     await msg.edit_text(full_text, reply_markup=keyboard)
+    test_state.message_id = msg.message_id  # Сюда же пишет обратный отсчёт (library/countdown.py)
+
+async def _show_keyboard(test_state: CurrentTestState, msg: Message) -> None:
+    """Только разметка: отметки выбранных вариантов."""
+    question_obj = test_state.current_question()
+    keyboard = get_test_keyboard(question_obj.options, test_state.selected_mask, test_state.current_index)
+    await msg.edit_reply_markup(reply_markup=keyboard)
 
 async def handle_answer_toggle(
     callback: CallbackQuery, 
-    test_state: CurrentTestState
+    test_state: CurrentTestState,
+    option: int
 ) -> None:
-    """Toggle ответ: add/remove set + edit markup (вопрос stays)."""
+    """Toggle ответ: XOR бита в маске сразу, ответ на callback сразу, edit markup — через debounce."""
+    if test_state.is_expired():
+        await handle_timeout(callback.bot, test_state)
+        await callback.answer()
+        return
     try:
-        ans_idx = int(callback.data.split("_")[1])
-        if ans_idx in test_state.selected_answers:
-            test_state.selected_answers.discard(ans_idx)
-        else:
-            test_state.selected_answers.add(ans_idx)
-        
-        question = test_state.questions[test_state.current_index]
-        await _show_question(question, test_state, callback)
-        logger.info(f"Toggle {callback.from_user.id}: {ans_idx} in {test_state.specialization}")
-    except (ValueError, IndexError) as e:
+        test_state.toggle(option)
+    except ValueError as e:
         logger.error(f"Toggle error: {e}")
         await callback.answer("❌ Ошибка выбора")
+        return
+    active_sessions.touch(test_state)
     await callback.answer()
+    
+    # 2-3 тапа подряд → одна правка с последней клавиатурой (текст вопроса не меняется)
+    msg = callback.message
+    edit_debouncer.schedule((msg.chat.id, msg.message_id), lambda: _show_keyboard(test_state, msg))
+    logger.info(f"Toggle {callback.from_user.id}: {option} in {test_state.specialization}")
+
+async def show_first_question(message: Message, test_state: CurrentTestState) -> None:
+    """Текущий вопрос новым сообщением (старт теста / после перехода)."""
+    full_text, keyboard = render_question(test_state)
+    sent = await message.answer(full_text, reply_markup=keyboard)
+    test_state.message_id = sent.message_id
 
 async def handle_next_question(
     callback: CallbackQuery, 
-    test_state: CurrentTestState, 
-    user_data: dict
+    test_state: CurrentTestState
 ) -> None:
-    """➡️ Далее: delete + следующий вопрос или finish."""
-    await callback.message.delete()
-    
+    """➡️ Далее: следующий вопрос новым сообщением (старое — в очередь удаления) или finish."""
+    if test_state.is_expired():
+        await handle_timeout(callback.bot, test_state)
+        await callback.answer()
+        return
+    # Переход — до первого await: повторное нажатие той же кнопки уже не совпадёт с индексом
     test_state.current_index += 1
-    if test_state.current_index >= len(test_state.questions):
+    is_last = test_state.current_index >= len(test_state.question_ids)
+    test_state.message_id = 0  # Старое сообщение обратный отсчёт больше не правит
+    edit_debouncer.cancel((callback.message.chat.id, callback.message.message_id))
+    message_deleter.schedule(callback.message)  # Старый вопрос — пачкой, не на пути ответа
+    await callback.answer()
+    
+    if is_last:
         await finish_test(callback.message, test_state)
         return
     
-    question = test_state.questions[test_state.current_index]
-    await _show_question(question, test_state, callback.message)
-    await user_data.update(test_state=test_state)  # FSM persist
+    active_sessions.touch(test_state)
+    await show_first_question(callback.message, test_state)
     logger.info(f"Next {callback.from_user.id}: {test_state.current_index}")
 
 async def finish_test(
     message: Message, 
     test_state: CurrentTestState
 ) -> None:
-    """Завершить: stats, stop timer, PDF stub, finish keyboard."""
-    safe_timer_stop(test_state.timer_task)
+    """Завершить: снять сессию, stats, PDF stub, finish keyboard."""
+    await _complete_test(message.bot, message.chat.id, test_state)
+
+async def handle_timeout(bot: Bot, test_state: CurrentTestState) -> None:
+    """Дедлайн прошёл: из хэндлера (ленивая проверка) или sweeper'а сессий."""
+    try:
+        await bot.send_message(test_state.chat_id, "⏰ <b>Время вышло!</b>", parse_mode="HTML")
+    except Exception as e:
+        logger.error(f"Timeout message error {test_state.user_id}: {e}")
+    await _complete_test(bot, test_state.chat_id, test_state)
+
+async def _complete_test(bot: Bot, chat_id: int, test_state: CurrentTestState) -> None:
+    if test_state.finished:
+        return  # Итоги уже сохранены и отправлены
+    test_state.finished = True
+    if active_sessions.get(test_state.user_id) is test_state:
+        active_sessions.end_session(test_state.user_id)
     
-    total = len(test_state.questions)
-    correct = 0
-    for q in test_state.questions:
-        if test_state.selected_answers & q.correct_answers:  # Multiple OK if intersect
-            correct += 1
+    total = len(test_state.question_ids)
+    correct = test_state.correct_count()  # Точное совпадение масок по каждому вопросу
     
     score = (correct / total) * 100
+    result = TestResult(
+        user_data=UserData(
+            full_name=test_state.full_name,
+            position=test_state.position,
+            department=test_state.department,
+            specialization=test_state.specialization,
+            difficulty=test_state.difficulty
+        ),
+        grade=grade_for_percentage(score),
+        percentage=round(score, 1),
+        correct_count=correct,
+        total_questions=total
+    )
+    try:
+        # Вопросы + маски ответов попытки: нужны для пересчёта (library/regrade.py)
+        await stats_manager.save_result(test_state.user_id or chat_id, result, test_state)
+    except Exception as e:
+        logger.error(f"Save result error {test_state.user_id}: {e}")
+    
     stats_text = (
         f"✅ Завершен тест: {test_state.specialization} ({test_state.difficulty.value})\n"
         f"👤 {test_state.full_name}, {test_state.position}\n"
@@ -92,9 +160,9 @@ async def finish_test(
     )
     
     # PDF stub (ReportLab next)
-    pdf_path = settings.work_dir / settings.certs_dir / f"{test_state.specialization}_{message.from_user.id}.pdf"
+    pdf_path = settings.certs_dir / f"{test_state.specialization}_{test_state.user_id or chat_id}.pdf"
     # await generate_pdf(test_state, pdf_path)  # Stub
     
     keyboard = get_finish_keyboard()
-    await message.answer(stats_text, reply_markup=keyboard)
-    logger.info(f"Finish {message.from_user.id}: {score:.1f}% {test_state.specialization}")
+    await bot.send_message(chat_id, stats_text, reply_markup=keyboard)
+    logger.info(f"Finish {test_state.user_id or chat_id}: {score:.1f}% {test_state.specialization}")
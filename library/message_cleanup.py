@@ -0,0 +1,84 @@
+"""
+Отложенное пакетное удаление сообщений (ввод ФИО/должности, прошлые вопросы).
+Хэндлер только ставит сообщение в очередь своего чата и сразу отвечает пользователю;
+очередь сбрасывается через delete_batch_delay одним deleteMessages на чат (до 100 id).
+Ошибки не мешают тесту: сообщение могло быть уже удалено или старше 48 часов.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.types import Message
+
+from config.settings import settings
+from .send_queue import mark_background
+
+logger = logging.getLogger(__name__)
+
+# Лимит Bot API на один deleteMessages
+MAX_BATCH = 100
+
+
+class MessageDeleter:
+    """Очереди удаления по чатам + фоновый сброс пачками."""
+
+    def __init__(self, delay: Optional[float] = None):
+        self.delay = settings.delete_batch_delay if delay is None else delay
+        self._pending: Dict[int, List[int]] = {}
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, int] = {
+            "scheduled": 0,
+            "deleted": 0,
+            "batches": 0,
+            "failed": 0,    # Сообщений в пачках, которые Telegram отклонил
+        }
+
+    def schedule(self, message: Message) -> None:
+        """Удалить сообщение позже (не ждём ответа API)."""
+        self._bot = message.bot
+        self._pending.setdefault(message.chat.id, []).append(message.message_id)
+        self.metrics["scheduled"] += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_later(), name="message-deleter")
+
+    async def _flush_later(self) -> None:
+        mark_background()  # Удаления уступают ответам пользователям
+        while self._pending:  # Поставленное во время сброса уйдёт следующей пачкой
+            await asyncio.sleep(self.delay)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Сбросить все очереди: deleteMessages на чат, пачками по MAX_BATCH."""
+        pending, self._pending = self._pending, {}
+        batches = [
+            (chat_id, ids[i:i + MAX_BATCH])
+            for chat_id, ids in pending.items()
+            for i in range(0, len(ids), MAX_BATCH)
+        ]
+        await asyncio.gather(*(self._delete(chat_id, ids) for chat_id, ids in batches))
+
+    async def _delete(self, chat_id: int, message_ids: List[int]) -> None:
+        self.metrics["batches"] += 1
+        try:
+            await self._bot.delete_messages(chat_id=chat_id, message_ids=message_ids)
+            self.metrics["deleted"] += len(message_ids)
+        except Exception as e:
+            self.metrics["failed"] += len(message_ids)
+            logger.debug(f"deleteMessages chat={chat_id} ({len(message_ids)} шт.): {e}")
+
+    async def stop(self) -> None:
+        """Дочистить очередь при остановке."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._pending and self._bot is not None:
+            await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.metrics, "pending": sum(map(len, self._pending.values()))}
+
+
+# Глобальный экземпляр
+message_deleter = MessageDeleter()
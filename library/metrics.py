@@ -0,0 +1,73 @@
+"""
+Сводка метрик всех компонентов бота: одна точка для /healthz (webhook, служебный адрес)
+и периодической строки в лог (работает в обоих режимах, включая polling без HTTP).
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from aiogram import Bot
+
+from config.settings import settings
+from .bank_watcher import bank_watcher
+from .countdown import countdown_refresher
+from .edit_debouncer import edit_debouncer
+from .message_cleanup import message_deleter
+from .middlewares import anti_spam
+from .question_bank import question_bank_cache
+from .send_queue import send_scheduler
+from .sessions import active_sessions
+
+logger = logging.getLogger(__name__)
+
+
+def collect_stats(bot: Optional[Bot] = None) -> Dict[str, Any]:
+    """Снимок метрик по компонентам (+ задержки Bot API, если сессия их считает)."""
+    stats: Dict[str, Any] = {
+        "sessions": active_sessions.stats(),
+        "send_queue": send_scheduler.stats(),
+        "antispam": anti_spam.stats(),
+        "countdown": countdown_refresher.stats(),
+        "bank_watcher": bank_watcher.stats(),
+        "bank_cache": question_bank_cache.stats(),
+        "message_deleter": message_deleter.stats(),
+        "edit_debouncer": edit_debouncer.stats(),
+    }
+    latency = getattr(bot.session, "latency_summary", None) if bot is not None else None
+    if latency is not None:
+        stats["bot_api"] = latency()
+    return stats
+
+
+class StatsReporter:
+    """Раз в stats_log_interval — сводка collect_stats() одной строкой в лог."""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = settings.stats_log_interval if interval is None else interval
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, bot: Bot) -> None:
+        self._bot = bot
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="stats-reporter")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info(f"📊 Метрики: {collect_stats(self._bot)}")  # Итог за время работы
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                logger.info(f"📊 Метрики: {collect_stats(self._bot)}")
+            except Exception as e:
+                logger.error(f"Метрики: {e}", exc_info=True)
+
+
+# Глобальный экземпляр
+stats_reporter = StatsReporter()
@@ -1,43 +1,105 @@
 """
 Middlewares: AntiSpam (flood protect), ErrorHandler.
-Для dp.message.middleware(AntiSpamMiddleware()).
+Антиспам — один общий экземпляр anti_spam на всё (test_bot_main):
+dp.message.outer_middleware(anti_spam) + dp.callback_query.outer_middleware(anti_spam).
 """
 import logging
 import time
-from typing import Dict, Any
-from collections import defaultdict, deque
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
 
+from config.settings import settings
+
 logger = logging.getLogger(__name__)
 
 class AntiSpamMiddleware(BaseMiddleware):
-    """Rate limit: max 5 msg/sec per user."""
-    
-    def __init__(self, max_requests: int = 5, window: int = 1):
-        self.max_requests = max_requests
-        self.window = window
-        self.user_requests: Dict[int, deque[float]] = defaultdict(deque)
-    
+    """
+    Token bucket на пользователя: antispam_rate событий/с, всплеск antispam_burst.
+    Одна проверка на событие — O(1): пополнение по прошедшему времени, без истории.
+    Корзины — в OrderedDict как LRU: не больше max_users, простаивающие дольше
+    idle_ttl удаляются с головы (новая корзина для них была бы такой же).
+    Предупреждение — не чаще warn_interval на пользователя, остальное молча отбрасывается.
+    Регистрировать один экземпляр outer-middleware на dp.message и dp.callback_query.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_users: Optional[int] = None,
+        warn_interval: Optional[float] = None
+    ):
+        self.rate = rate or settings.antispam_rate
+        self.burst = burst or settings.antispam_burst
+        self.max_users = max_users or settings.antispam_max_users
+        self.warn_interval = settings.antispam_warn_interval if warn_interval is None else warn_interval
+        # Через столько корзина снова полна, а окно предупреждения закрыто: запись можно забыть
+        self.idle_ttl = max(self.burst / self.rate, self.warn_interval)
+        # user_id → [токены, monotonic последнего события, monotonic последнего предупреждения]
+        self._buckets: OrderedDict[int, List[float]] = OrderedDict()
+        self.metrics: Dict[str, int] = {
+            "passed": 0,
+            "dropped": 0,
+            "warned": 0,
+            "evicted": 0,
+        }
+
     async def __call__(
         self, 
         handler, 
         event: Message | CallbackQuery, 
         data: Dict[str, Any]
     ) -> Any:
-        user_id = event.from_user.id
-        now = time.time()
-        
-        # Cleanup old
-        req_queue = self.user_requests[user_id]
-        req_queue[:] = [t for t in req_queue if now - t < self.window]
-        
-        if len(req_queue) >= self.max_requests:
-            await event.answer("⏳ Не спамь! Подожди секунду.")
-            return
-        
-        req_queue.append(now)
-        return await handler(event, data)
+        user = event.from_user
+        if user is None:
+            return await handler(event, data)
+        now = time.monotonic()
+
+        bucket = self._buckets.get(user.id)
+        if bucket is None:
+            bucket = self._buckets[user.id] = [float(self.burst), now, -self.warn_interval]
+            self._evict(now)
+        else:
+            self._buckets.move_to_end(user.id)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            self.metrics["passed"] += 1
+            return await handler(event, data)
+
+        self.metrics["dropped"] += 1
+        if now - bucket[2] >= self.warn_interval:
+            bucket[2] = now
+            self.metrics["warned"] += 1
+            logger.warning(f"Спам от {user.id}: слишком частые события")
+            try:
+                await event.answer("⏳ Не спамь! Подожди секунду.")
+            except Exception as e:
+                logger.debug(f"Антиспам: предупреждение {user.id} не отправлено: {e}")
+        elif isinstance(event, CallbackQuery):
+            # Без ответа кнопка крутит «часики» до таймаута Telegram — гасим молча
+            try:
+                await event.answer()
+            except Exception as e:
+                logger.debug(f"Антиспам: callback {user.id} не закрыт: {e}")
+        return None
+
+    def _evict(self, now: float) -> None:
+        """С головы LRU: сверх лимита или простаивающие — amortized O(1) на нового пользователя."""
+        buckets = self._buckets
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if len(buckets) <= self.max_users and now - oldest[1] < self.idle_ttl:
+                break
+            buckets.popitem(last=False)
+            self.metrics["evicted"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.metrics, "users": len(self._buckets)}
 
 class ErrorHandlerMiddleware(BaseMiddleware):
     """Catch all errors, log, answer."""
@@ -59,3 +121,7 @@ class ErrorHandlerMiddleware(BaseMiddleware):
                     pass
             else:
                 await event.answer("❌ Ошибка. Попробуй /start")
+
+
+# Глобальный экземпляр
+anti_spam = AntiSpamMiddleware()
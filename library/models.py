@@ -1,18 +1,27 @@
 """
-Модели для тестов: Pydantic v2, 4 уровня сложности.
-Question: из JSON (difficulty optional → BASIC).
-CurrentTestState: toggle-ответы, таймер, результаты.
+Модели для тестов, 4 уровня сложности.
+Question (Pydantic v2): только валидация JSON при загрузке банка (difficulty optional → BASIC).
+QuestionRecord: неизменяемый slotted-вопрос банка, общий для всех сессий.
+UserData/TestResult (Pydantic): сохранённый результат попытки.
+CurrentTestState: slotted dataclass — ссылка на банк + индексы вопросов,
+ответы битовыми масками (array('B')), monotonic-дедлайн.
 """
-from typing import List, Set, Optional
-from pydantic import BaseModel, Field, validator
+import time
+from array import array
+from dataclasses import dataclass, field
+from operator import xor
+from typing import Any, FrozenSet, List, Set, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, validator
 from enum import Enum
-from config.settings import Difficulty
+from .enum import Difficulty
 
 class Question(BaseModel):
-    """Вопрос из библиотеки."""
+    """Схема вопроса из JSON (валидация на входе, дальше — QuestionRecord)."""
+    model_config = ConfigDict(frozen=True)
+
     question: str = Field(..., min_length=1, max_length=2000)
-    options: List[str] = Field(..., min_items=3, max_items=6)
-    correct_answers: Set[int] = Field(..., min_items=1, max_items=len(options))
+    options: Tuple[str, ...] = Field(..., min_items=3, max_items=6)
+    correct_answers: FrozenSet[int] = Field(..., min_items=1, max_items=6)
     difficulty: Difficulty = Difficulty.BASIC  # Default для JSON без поля
 
     @validator('correct_answers')
@@ -22,22 +31,126 @@ class Question(BaseModel):
             raise ValueError('correct_answers: 1-based индексы 1..N')
         return v
 
-class CurrentTestState(BaseModel):
-    """Состояние текущего теста."""
-    questions: List[Question]
+def answers_to_mask(answers) -> int:
+    """1-based номера вариантов → битовая маска (вариант N = бит N-1)."""
+    mask = 0
+    for num in answers:
+        mask |= 1 << (num - 1)
+    return mask
+
+def mask_to_answers(mask: int) -> Set[int]:
+    """Битовая маска → 1-based номера вариантов."""
+    return {bit + 1 for bit in range(mask.bit_length()) if mask >> bit & 1}
+
+class UserData(BaseModel):
+    """Данные тестируемого (для результата/сертификата)."""
+    full_name: str = ""
+    position: str = ""
+    department: str = ""
+    specialization: str = ""
+    difficulty: Difficulty = Difficulty.BASIC
+
+class TestResult(BaseModel):
+    """Итог попытки: сохраняется в stats.db (result_json) и идёт в сертификат."""
+    user_data: UserData
+    grade: str
+    percentage: float
+    correct_count: int
+    total_questions: int
+    elapsed_time: str = ""
+
+@dataclass(frozen=True, slots=True)
+class QuestionRecord:
+    """Runtime-вопрос банка: слоты без pydantic, валидация уже пройдена в Question."""
+    question: str
+    options: Tuple[str, ...]
+    correct_answers: FrozenSet[int]
+    difficulty: Difficulty = Difficulty.BASIC
+    correct_mask: int = field(init=False, repr=False, compare=False)  # Ключ для оценки
+
+    def __post_init__(self):
+        object.__setattr__(self, "correct_mask", answers_to_mask(self.correct_answers))
+
+    @classmethod
+    def from_model(cls, q: Question) -> "QuestionRecord":
+        return cls(q.question, q.options, q.correct_answers, q.difficulty)
+
+@dataclass(slots=True)
+class CurrentTestState:
+    """Состояние текущего теста (горячий путь: toggle/next/finish без pydantic)."""
+    bank: Any  # QuestionBank: общий неизменяемый банк (после hot reload — старый по ссылке)
+    question_ids: Tuple[int, ...]
+    user_id: int = 0
     current_index: int = 0
-    selected_answers: Set[int] = Field(default_factory=set)
+    answers: array = field(default=None)  # array('B'): маска ответа на каждый вопрос
+    answer_key: bytes = b""  # Маски правильных ответов в порядке вопросов теста
     start_time: Optional[float] = None
-    timer_task: Optional['asyncio.Task'] = None  # Forward ref
+    deadline: float = float("inf")  # time.monotonic() конца теста (library/sessions.py)
+    chat_id: int = 0
+    message_id: int = 0     # Сообщение с текущим вопросом (для живого обратного отсчёта)
+    shown_minute: int = -1  # Минута, показанная в заголовке ⏰ при последней отрисовке
+    finished: bool = False  # Итоги уже подведены (двойной «Далее», таймаут + «Далее»)
     full_name: str = ""
     position: str = ""
     department: str = ""
     specialization: str = ""
     difficulty: Difficulty = Difficulty.BASIC
 
-    @validator('current_index')
-    def validate_index(cls, v, values):
-        questions = values.get('questions', [])
-        if not questions or v >= len(questions):
-            raise ValueError('current_index валиден для questions')
-        return v
+    @property
+    def questions(self) -> List[QuestionRecord]:
+        """Вопросы теста — общие объекты банка."""
+        bank_questions = self.bank.questions
+        return [bank_questions[i] for i in self.question_ids]
+
+    def __post_init__(self):
+        if self.answers is None:
+            self.answers = array("B", bytes(len(self.question_ids)))
+        if not self.answer_key:
+            masks = self.bank.correct_masks
+            self.answer_key = bytes(masks[i] for i in self.question_ids)
+
+    def current_question(self) -> QuestionRecord:
+        return self.bank.questions[self.question_ids[self.current_index]]
+
+    @property
+    def selected_mask(self) -> int:
+        """Маска выбранных вариантов текущего вопроса."""
+        return self.answers[self.current_index]
+
+    @property
+    def selected_answers(self) -> Set[int]:
+        """1-based номера выбранных вариантов текущего вопроса (для отображения)."""
+        return mask_to_answers(self.answers[self.current_index])
+
+    def toggle(self, option: int) -> None:
+        """Переключить 1-based вариант текущего вопроса: один XOR, без аллокаций."""
+        if not 1 <= option <= len(self.current_question().options):
+            raise ValueError(f"вариант {option} вне 1..N")
+        self.answers[self.current_index] ^= 1 << (option - 1)
+
+    def correct_count(self) -> int:
+        """Точное совпадение маски ответа с ключом: XOR по вопросам, нули = верно."""
+        return bytes(map(xor, self.answers, self.answer_key)).count(0)
+
+    def remaining_seconds(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def minutes_left(self) -> int:
+        return int(self.remaining_seconds()) // 60
+
+    def is_expired(self) -> bool:
+        """Ленивая проверка дедлайна: вызывается хэндлерами при каждом действии."""
+        return time.monotonic() >= self.deadline
+
+    def time_left_text(self, minutes_only: bool = False) -> str:
+        """
+        Остаток времени "MM:SS" (∞ — дедлайн не выставлен).
+        minutes_only — "N мин": точность, с которой заголовок обновляет обратный отсчёт.
+        """
+        if self.deadline == float("inf"):
+            return "∞"
+        if minutes_only:
+            minutes = self.minutes_left()
+            return f"{minutes} мин" if minutes else "< 1 мин"
+        minutes, seconds = divmod(int(self.remaining_seconds()), 60)
+        return f"{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,340 @@
+"""
+Кэш банков вопросов в памяти процесса.
+Каждая специализация парсится и валидируется один раз,
+повторный разбор — только если у JSON изменились mtime/size.
+.qbank (см. bank_compiler), собранный из той же версии JSON, предпочитается JSON.
+Пулы по уровням сложности (поле difficulty из JSON) и порядок добора
+из соседних уровней строятся один раз при загрузке банка.
+"""
+import hashlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+from .models import Question, QuestionRecord, Difficulty
+
+logger = logging.getLogger(__name__)
+
+# Порядок уровней: соседи по сложности для добора
+LEVELS: Tuple[Difficulty, ...] = tuple(Difficulty)
+
+# JSON "difficulty": значение enum ("базовый") или имя ("basic"/"BASIC")
+_DIFFICULTY_ALIASES: Dict[str, Difficulty] = {
+    **{d.value: d for d in Difficulty},
+    **{d.name.lower(): d for d in Difficulty},
+}
+
+
+def parse_difficulty(raw) -> Difficulty:
+    """Поле difficulty из JSON → Difficulty (нет поля → BASIC)."""
+    if raw is None or raw == "":
+        return Difficulty.BASIC
+    try:
+        return _DIFFICULTY_ALIASES[str(raw).strip().lower()]
+    except KeyError:
+        raise ValueError(f"неизвестная сложность {raw!r}") from None
+
+
+def spillover_order(level: Difficulty, policy: str) -> Tuple[Difficulty, ...]:
+    """
+    Уровни для добора, ближние первыми (при равном расстоянии — более лёгкий).
+    none — без добора, adjacent — только соседние, all — все по удалённости.
+    """
+    if policy == "none":
+        return ()
+    pos = LEVELS.index(level)
+    others = sorted(
+        (d for d in LEVELS if d is not level),
+        key=lambda d: (abs(LEVELS.index(d) - pos), LEVELS.index(d))
+    )
+    if policy == "adjacent":
+        return tuple(d for d in others if abs(LEVELS.index(d) - pos) == 1)
+    return tuple(others)
+
+
+@dataclass(frozen=True)
+class QuestionBank:
+    """Разобранный банк вопросов одной специализации + пулы по уровням."""
+    specialization: str
+    questions: Tuple[QuestionRecord, ...]
+    mtime_ns: int
+    size: int
+    rejected: int = 0  # Сколько вопросов JSON не прошли валидацию
+    pools: Dict[Difficulty, Tuple[int, ...]] = field(init=False, repr=False, compare=False)
+    spillover: Dict[Difficulty, Tuple[Difficulty, ...]] = field(init=False, repr=False, compare=False)
+    correct_masks: bytes = field(init=False, repr=False, compare=False)  # Ключ: маска по индексу вопроса
+    fingerprint: str = field(init=False, repr=False, compare=False)  # Отпечаток раскладки, см. layout_fingerprint
+
+    def __post_init__(self):
+        by_level: Dict[Difficulty, List[int]] = {d: [] for d in LEVELS}
+        for idx, q in enumerate(self.questions):
+            by_level[q.difficulty].append(idx)
+        pools = {level: tuple(ids) for level, ids in by_level.items()}
+
+        policy = settings.difficulty_spillover
+        spillover = {level: spillover_order(level, policy) for level in LEVELS}
+
+        # Один раз на загрузку банка, не на каждый старт теста
+        for level in LEVELS:
+            need = settings.difficulty_questions.get(level.value, 30)
+            available = len(pools[level]) + sum(len(pools[d]) for d in spillover[level])
+            if len(pools[level]) < need:
+                logger.info(
+                    f"Банк {self.specialization}:{level.value}: {len(pools[level])} < {need}, "
+                    f"добор ({policy}) до {min(need, available)}"
+                )
+
+        object.__setattr__(self, "pools", pools)
+        object.__setattr__(self, "spillover", spillover)
+        object.__setattr__(self, "correct_masks", bytes(q.correct_mask for q in self.questions))
+        object.__setattr__(self, "fingerprint", layout_fingerprint(self.questions))
+
+    def sample_ids(self, difficulty: Difficulty, count: int, rng: random.Random) -> List[int]:
+        """
+        count индексов: сначала пул уровня, недостающее — из соседних по политике.
+        Стоимость O(count), а не O(размер банка).
+        """
+        pool = self.pools[difficulty]
+        ids = rng.sample(pool, min(count, len(pool)))
+        for level in self.spillover[difficulty]:
+            missing = count - len(ids)
+            if missing <= 0:
+                break
+            extra = self.pools[level]
+            ids.extend(rng.sample(extra, min(missing, len(extra))))
+        return ids
+
+
+def layout_fingerprint(questions: Sequence[QuestionRecord]) -> str:
+    """
+    Хэш текстов, вариантов и уровней вопросов в порядке индексов, без ключа ответов.
+    Совпал — индекс вопроса означает тот же вопрос (сохранённые сессии и попытки валидны);
+    исправление correct_answers отпечаток не меняет.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for q in questions:
+        digest.update("\x1f".join((q.question, *q.options, q.difficulty.value)).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def parse_questions(specialization: str, raw_data: list) -> List[QuestionRecord]:
+    """JSON-список → провалидированные QuestionRecord (битые пропускаются)."""
+    questions = []
+    for idx, item in enumerate(raw_data):
+        try:
+            if not isinstance(item, dict):
+                logger.warning(f"Skip {specialization}:{idx} not object")
+                continue
+            opts = item.get("options", [])
+            if not isinstance(opts, list) or len(opts) < 3:
+                logger.warning(f"Skip {specialization}:{idx} invalid options")
+                continue
+
+            correct_str = item.get("correct_answers", "")
+            if not isinstance(correct_str, str):
+                logger.warning(f"Skip {specialization}:{idx} correct_answers не строка")
+                continue
+            correct = set(int(x.strip()) for x in correct_str.split(",") if x.strip().isdigit())
+
+            # intern: одинаковые строки (варианты "Да"/"Нет", тексты после reload) — один объект
+            q = Question(
+                question=sys.intern(item["question"]),
+                options=tuple(sys.intern(o) for o in opts),
+                correct_answers=correct,
+                difficulty=parse_difficulty(item.get("difficulty"))
+            )
+            questions.append(QuestionRecord.from_model(q))
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Skip вопрос {specialization}:{idx}: {e}")
+            continue
+    return questions
+
+
+def load_bank_file(specialization: str, json_path: Path) -> Optional[QuestionBank]:
+    """Чтение + валидация JSON-файла специализации."""
+    try:
+        stat = json_path.stat()
+        with json_path.open("r", encoding="utf-8") as f:
+            raw_data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
+        logger.error(f"JSON error {specialization}: {e}")
+        return None
+
+    if not isinstance(raw_data, list):
+        logger.error(f"Invalid JSON {specialization}: not list")
+        return None
+
+    questions = tuple(parse_questions(specialization, raw_data))
+    return QuestionBank(
+        specialization=specialization,
+        questions=questions,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        rejected=len(raw_data) - len(questions),
+    )
+
+
+class QuestionBankCache:
+    """
+    Процессный кэш банков: stat() на доступ, парсинг только при изменении.
+    Банки неизменяемы и подменяются целиком (swap): сессии держат старые по ссылке.
+    Блокировка — только на проверку и подмену словаря, разбор JSON идёт вне её.
+    """
+
+    def __init__(self, questions_dir: Optional[Path] = None):
+        self.questions_dir = questions_dir or settings.questions_dir
+        self._banks: Dict[str, QuestionBank] = {}
+        self._checked_at: Dict[str, float] = {}  # monotonic последнего stat()
+        self._rejected: Dict[str, Tuple[int, int]] = {}  # (mtime_ns, size) невалидной версии файла
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, specialization: str) -> Path:
+        return self.questions_dir / f"{specialization}.json"
+
+    def get(self, specialization: str) -> Optional[QuestionBank]:
+        """Банк из кэша, если файл не менялся; иначе перечитать."""
+        json_path = self.path_for(specialization)
+        try:
+            stat = json_path.stat()
+        except OSError as e:
+            logger.error(f"JSON error {specialization}: {e}")
+            with self._lock:
+                self._banks.pop(specialization, None)
+            return None
+
+        with self._lock:
+            self._checked_at[specialization] = time.monotonic()
+            bank = self._banks.get(specialization)
+            if bank and not self._changed(specialization, bank, stat):
+                self.hits += 1
+                return bank
+            self.misses += 1
+
+        # Разбор и валидация — без блокировки: peek() и другие специализации не ждут
+        new_bank = self._safe_load(specialization, json_path, stat)
+
+        with self._lock:
+            current = self._banks.get(specialization)
+            if not new_bank or not new_bank.questions:
+                # Битая правка: остаёмся на прежней версии, файл не перечитываем
+                self._rejected[specialization] = (stat.st_mtime_ns, stat.st_size)
+                return current
+            if current is not bank and current is not None and not self._changed(specialization, current, stat):
+                return current  # Эту версию уже положил параллельный get()/swap()
+            self._banks[specialization] = new_bank
+
+        logger.info(
+            f"Банк {specialization}: {len(new_bank.questions)} вопросов "
+            f"(hits={self.hits}, misses={self.misses})"
+        )
+        return new_bank
+
+    def _changed(self, specialization: str, bank: QuestionBank, stat) -> bool:
+        signature = (stat.st_mtime_ns, stat.st_size)
+        return signature != (bank.mtime_ns, bank.size) and signature != self._rejected.get(specialization)
+
+    def stale_specializations(self) -> List[str]:
+        """Загруженные банки, чей файл изменился (для фонового watcher, блокирует)."""
+        with self._lock:
+            loaded = dict(self._banks)
+        stale = []
+        for specialization, bank in loaded.items():
+            try:
+                stat = self.path_for(specialization).stat()
+            except OSError:
+                continue
+            with self._lock:
+                self._checked_at[specialization] = time.monotonic()
+                if self._changed(specialization, bank, stat):
+                    stale.append(specialization)
+        return stale
+
+    def build(self, specialization: str) -> Optional[QuestionBank]:
+        """
+        Новый банк из файла без записи в кэш (валидация перед swap, блокирует).
+        Невалидная версия файла запоминается и больше не перечитывается.
+        """
+        json_path = self.path_for(specialization)
+        try:
+            stat = json_path.stat()
+        except OSError as e:
+            logger.error(f"JSON error {specialization}: {e}")
+            return None
+        bank = self._safe_load(specialization, json_path, stat)
+        if not bank or not bank.questions:
+            with self._lock:
+                self._rejected[specialization] = (stat.st_mtime_ns, stat.st_size)
+            return None
+        return bank
+
+    def swap(self, specialization: str, bank: QuestionBank) -> Optional[QuestionBank]:
+        """Атомарная подмена банка. Возвращает прежний."""
+        with self._lock:
+            old = self._banks.get(specialization)
+            self._banks[specialization] = bank
+            self._checked_at[specialization] = time.monotonic()
+            self._rejected.pop(specialization, None)
+        return old
+
+    def peek(self, specialization: str) -> Optional[QuestionBank]:
+        """
+        Банк без stat(), если файл проверялся не раньше question_bank_recheck_seconds.
+        Не блокирует: годится для вызова прямо из event loop.
+        """
+        with self._lock:
+            bank = self._banks.get(specialization)
+            checked_at = self._checked_at.get(specialization, 0.0)
+            if bank is None or time.monotonic() - checked_at > settings.question_bank_recheck_seconds:
+                return None
+            self.hits += 1
+            return bank
+
+    def _safe_load(self, specialization: str, json_path: Path, stat) -> Optional[QuestionBank]:
+        """_load, но любая ошибка разбора — отклонённая версия файла (None), а не исключение."""
+        try:
+            return self._load(specialization, json_path, stat)
+        except Exception as e:
+            logger.error(f"Банк {specialization} отклонён: {type(e).__name__}: {e}")
+            return None
+
+    def _load(self, specialization: str, json_path: Path, stat) -> Optional[QuestionBank]:
+        """Скомпилированный .qbank, если собран из этой же версии JSON (mtime_ns/size); иначе JSON."""
+        from .bank_compiler import compiled_path_for, load_compiled_bank
+
+        compiled_path = compiled_path_for(json_path)
+        if compiled_path.exists():
+            bank = load_compiled_bank(specialization, compiled_path, stat.st_mtime_ns, stat.st_size)
+            if bank is not None:
+                return bank
+        return load_bank_file(specialization, json_path)
+
+    def invalidate(self, specialization: Optional[str] = None) -> None:
+        """Сброс одной специализации или всего кэша."""
+        with self._lock:
+            if specialization is None:
+                self._banks.clear()
+                self._checked_at.clear()
+                self._rejected.clear()
+            else:
+                self._banks.pop(specialization, None)
+                self._checked_at.pop(specialization, None)
+                self._rejected.pop(specialization, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Счётчики для логов/метрик."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "banks": len(self._banks)}
+
+
+# Глобальный экземпляр
+question_bank_cache = QuestionBankCache()
@@ -1,81 +1,107 @@
 """
-Загрузка вопросов из JSON файлов специализаций.
-Фильтр по уровню сложности + fallback.
-Random.sample(count) с user_seed для fairness.
+Загрузка вопросов из JSON файлов специализаций (через кэш банков).
+Пул по уровню сложности (+ добор из соседних) берётся из индекса банка.
+Random(user_seed).sample(count) — fairness без глобального seed.
+load_questions_async: холодная загрузка в пуле потоков, дедупликация in-flight.
 """
-import json
+import asyncio
 import logging
 import random
-from pathlib import Path
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from config.settings import settings
-from .models import Question, Difficulty
+from .models import QuestionRecord, Difficulty
+from .question_bank import QuestionBank, question_bank_cache
 
 logger = logging.getLogger(__name__)
 
-def load_questions_for_specialization(
-    specialization: str, 
-    difficulty: Difficulty, 
-    user_id: int = None
-) -> List[Question]:
-    """
-    Загружает вопросы для специализации/сложности.
-    Фильтр: q.difficulty == target → fallback все.
-    """
-    json_path = settings.work_dir / settings.data_dir / f"{specialization}.json"
-    
-    try:
-        with json_path.open("r", encoding="utf-8") as f:
-            raw_data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
-        logger.error(f"JSON error {specialization}: {e}")
-        return []
-    
-    if not isinstance(raw_data, list):
-        logger.error(f"Invalid JSON {specialization}: not list")
-        return []
-    
-    questions = []
-    for idx, item in enumerate(raw_data):
-        try:
-            opts = item.get("options", [])
-            if not isinstance(opts, list) or len(opts) < 3:
-                logger.warning(f"Skip {specialization}:{idx} invalid options")
-                continue
-            
-            correct_str = item.get("correct_answers", "")
-            correct = set(int(x.strip()) for x in correct_str.split(",") if x.strip().isdigit())
-            
-            q = Question(
-                question=item["question"],
-                options=opts,
-                correct_answers=correct
-                # difficulty auto=BASIC из models.py
-            )
-            questions.append(q)
-        except (KeyError, ValueError, TypeError) as e:
-            logger.warning(f"Skip вопрос {specialization}:{idx}: {e}")
-            continue
+# Холодные загрузки банков — вне event loop
+_LOAD_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="qbank")
+_inflight: Dict[str, "asyncio.Future[Optional[QuestionBank]]"] = {}
+
+
+def _draw_ids(
+    bank: Optional[QuestionBank],
+    specialization: str,
+    difficulty: Difficulty,
+    user_id: Optional[int]
+) -> Tuple[int, ...]:
+    """Индексы count вопросов уровня в готовом банке."""
+    if bank is None:
+        return ()
     
-    # Фильтр по сложности
     target_diff = difficulty.value
-    filtered = [q for q in questions if q.difficulty.value == target_diff]
-    
-    # Fallback: если мало/нет → все вопросы
-    if len(filtered) < 5:
-        logger.warning(f"Fallback все вопросы {specialization} (filtered:{len(filtered)})")
-        filtered = questions[:]
-    
     count = settings.difficulty_questions.get(target_diff, 30)
-    if len(filtered) < count:
-        logger.warning(f"Мало вопросов {specialization}: {len(filtered)} < {count}")
-        count = len(filtered)
     
-    # User-seed random для fairness (не всегда один вопрос)
-    random.seed(user_id or 42)
-    random.shuffle(filtered)
-    selected = filtered[:count]
+    # Свой Random на запрос: user-seed без глобального random.seed()
+    rng = random.Random(user_id or 42)
+    selected = tuple(bank.sample_ids(difficulty, count, rng))
+    if len(selected) < count:
+        logger.debug(f"Мало вопросов {specialization}: {len(selected)} < {count}")
     
     logger.info(f"Загружено {len(selected)}/{count} вопросов {specialization}:{target_diff}")
     return selected
+
+
+def _draw_questions(
+    bank: Optional[QuestionBank],
+    specialization: str,
+    difficulty: Difficulty,
+    user_id: Optional[int]
+) -> List[QuestionRecord]:
+    """Выборка вопросов: общие объекты банка, без копий."""
+    ids = _draw_ids(bank, specialization, difficulty, user_id)
+    return [bank.questions[i] for i in ids]
+
+
+def load_questions_for_specialization(
+    specialization: str, 
+    difficulty: Difficulty, 
+    user_id: int = None
+) -> List[QuestionRecord]:
+    """
+    Загружает вопросы для специализации/сложности (синхронно, блокирует).
+    Пул уровня и порядок добора предвычислены в QuestionBank.
+    """
+    bank = question_bank_cache.get(specialization)
+    return _draw_questions(bank, specialization, difficulty, user_id)
+
+
+async def get_bank_async(specialization: str) -> Optional[QuestionBank]:
+    """
+    Банк без блокировки loop: свежий кэш — сразу, без executor;
+    иначе одна загрузка в пуле потоков на все конкурентные запросы.
+    """
+    bank = question_bank_cache.peek(specialization)
+    if bank is not None:
+        return bank
+    
+    future = _inflight.get(specialization)
+    if future is None:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_LOAD_EXECUTOR, question_bank_cache.get, specialization)
+        _inflight[specialization] = future
+        future.add_done_callback(lambda _: _inflight.pop(specialization, None))
+    # shield: отмена одного ожидающего не отменяет загрузку для остальных
+    return await asyncio.shield(future)
+
+
+async def draw_questions_async(
+    specialization: str,
+    difficulty: Difficulty,
+    user_id: int = None
+) -> Tuple[Optional[QuestionBank], Tuple[int, ...]]:
+    """Банк + индексы вопросов для CurrentTestState (сессия хранит только индексы)."""
+    bank = await get_bank_async(specialization)
+    return bank, _draw_ids(bank, specialization, difficulty, user_id)
+
+
+async def load_questions_async(
+    specialization: str,
+    difficulty: Difficulty,
+    user_id: int = None
+) -> List[QuestionRecord]:
+    """Async-версия load_questions_for_specialization для хэндлеров."""
+    bank = await get_bank_async(specialization)
+    return _draw_questions(bank, specialization, difficulty, user_id)
@@ -0,0 +1,148 @@
+"""
+Пакетный пересчёт оценок в stats.db после исправления ключа банка.
+Ответы и ключ — матрицы битовых масок NumPy, все попытки специализации
+оцениваются одним векторизованным проходом, оценки — по settings.grades.
+Индекс вопроса в попытке однозначен, пока отпечаток раскладки банка (QuestionBank.fingerprint:
+тексты, варианты, уровни — без ключа) тот же, что при сохранении; попытки с другим
+отпечатком (вопросы переставлены/изменены, старые записи без отпечатка) не пересчитываются.
+Запуск: python -m library.regrade [spec ...]  (по умолчанию все специализации).
+"""
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import aiosqlite
+import numpy as np
+
+from config.settings import settings, prepare_runtime
+from .question_bank import QuestionBank, question_bank_cache
+from .stats import stats_manager
+
+logger = logging.getLogger(__name__)
+
+
+def grade_thresholds() -> Tuple[List[str], np.ndarray]:
+    """Названия оценок и верхние границы процента по возрастанию."""
+    ordered = sorted(settings.grades.items(), key=lambda item: item[1])
+    return [name for name, _ in ordered], np.array([upper for _, upper in ordered])
+
+
+def score_attempts(
+    question_ids: List[bytes],
+    answers: List[bytes],
+    key: bytes
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Векторизованная оценка попыток.
+    question_ids: array('I').tobytes() на попытку, answers: array('B').tobytes().
+    Возвращает (correct, total, percentage). Вопрос вне банка — неверный.
+    """
+    lengths = np.fromiter(map(len, answers), dtype=np.int64, count=len(answers))
+    width = int(lengths.max()) if len(lengths) else 0
+
+    # Склейка всех попыток + scatter в матрицы N×width без цикла по строкам
+    flat_ids = np.frombuffer(b"".join(question_ids), dtype=np.uint32)
+    flat_answers = np.frombuffer(b"".join(answers), dtype=np.uint8)
+    rows = np.repeat(np.arange(len(answers)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    cols = np.arange(len(flat_answers)) - np.repeat(starts, lengths)
+
+    ids_matrix = np.zeros((len(answers), width), dtype=np.uint32)
+    answer_matrix = np.zeros((len(answers), width), dtype=np.uint8)
+    ids_matrix[rows, cols] = flat_ids
+    answer_matrix[rows, cols] = flat_answers
+
+    key_vector = np.frombuffer(key, dtype=np.uint8)
+    filled = np.arange(width) < lengths[:, None]
+    in_bank = ids_matrix < len(key_vector)
+    expected = key_vector[np.where(in_bank, ids_matrix, 0)]
+
+    correct = ((answer_matrix == expected) & filled & in_bank).sum(axis=1)
+    percentage = np.divide(correct * 100.0, lengths, out=np.zeros(len(lengths)), where=lengths > 0)
+    return correct, lengths, np.round(percentage, 1)
+
+
+def grade_percentages(percentage: np.ndarray) -> List[str]:
+    """Проценты → названия оценок (searchsorted по порогам settings.grades)."""
+    names, bounds = grade_thresholds()
+    idx = np.minimum(np.searchsorted(bounds, percentage, side="left"), len(names) - 1)
+    return [names[i] for i in idx]
+
+
+async def regrade_specialization(
+    specialization: str,
+    bank: Optional[QuestionBank] = None,
+    db_path: Optional[Path] = None
+) -> Dict[str, int]:
+    """
+    Пересчитать сохранённые попытки специализации по текущему ключу банка.
+    Обновляются и колонки, и result_json. skipped — попытки с другим отпечатком банка.
+    """
+    loop = asyncio.get_running_loop()
+    if bank is None:
+        bank = await loop.run_in_executor(None, question_bank_cache.get, specialization)
+    if bank is None or not bank.questions:
+        raise ValueError(f"Банк {specialization} не загружен")
+
+    db_path = db_path or stats_manager.db_path
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute("""
+            SELECT id, question_ids, answers, grade, result_json, bank_fingerprint FROM stats
+            WHERE specialization = ? AND answers IS NOT NULL
+        """, (specialization,)) as cursor:
+            all_rows = await cursor.fetchall()
+        rows = [row for row in all_rows if row[5] == bank.fingerprint]
+        skipped = len(all_rows) - len(rows)
+        if skipped:
+            logger.warning(f"Пересчёт {specialization}: {skipped} попыток с другой раскладкой банка пропущено")
+        if not rows:
+            return {"attempts": 0, "changed": 0, "skipped": skipped}
+
+        row_ids = [row[0] for row in rows]
+        old_grades = [row[3] for row in rows]
+
+        def compute():
+            correct, total, percentage = score_attempts(
+                [row[1] for row in rows], [row[2] for row in rows], bank.correct_masks
+            )
+            grades = grade_percentages(percentage)
+            correct, total, percentage = correct.tolist(), total.tolist(), percentage.tolist()
+            results = []
+            for row, *values in zip(rows, grades, percentage, correct, total):
+                result = json.loads(row[4]) if row[4] else {}
+                result.update(zip(("grade", "percentage", "correct_count", "total_questions"), values))
+                results.append(json.dumps(result, ensure_ascii=False))
+            return correct, total, percentage, grades, results
+
+        # CPU-работа NumPy и JSON — вне event loop
+        correct, total, percentage, grades, results = await loop.run_in_executor(None, compute)
+
+        await db.executemany("""
+            UPDATE stats SET grade = ?, percentage = ?, correct_count = ?, total_questions = ?, result_json = ?
+            WHERE id = ?
+        """, zip(grades, percentage, correct, total, results, row_ids))
+        await db.commit()
+
+    changed = sum(old != new for old, new in zip(old_grades, grades))
+    logger.info(f"Пересчёт {specialization}: {len(rows)} попыток, изменились оценки у {changed}")
+    return {"attempts": len(rows), "changed": changed, "skipped": skipped}
+
+
+async def main(argv: List[str]) -> int:
+    """CLI: пересчёт указанных (или всех) специализаций."""
+    prepare_runtime(require_token=False)  # Офлайн-утилита: токен бота не нужен
+    await stats_manager.init_db()
+    for specialization in argv or settings.specializations:
+        report = await regrade_specialization(specialization)
+        print(
+            f"{specialization}: {report['attempts']} попыток, оценка изменилась у {report['changed']}, "
+            f"пропущено (другой банк) {report['skipped']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -3,7 +3,17 @@
 """
 
 from typing import Dict
-from library import CurrentTestState
+from config.settings import settings
+from .models import CurrentTestState
+
+
+def grade_for_percentage(percentage: float) -> str:
+    """Оценка по settings.grades: первый порог (по возрастанию), не меньший процента."""
+    thresholds = sorted(settings.grades.items(), key=lambda item: item[1])
+    for grade, upper in thresholds:
+        if percentage <= upper:
+            return grade
+    return thresholds[-1][0]
 
 def calculate_test_results(test_state: CurrentTestState) -> Dict:
     """
@@ -13,18 +23,12 @@ def calculate_test_results(test_state: CurrentTestState) -> Dict:
         test_state: Состояние теста
         
     Returns:
-        Dict: score, total, percent, status, details
+        Dict: score, total, percent, status, details, answers
     """
-    total_questions = len(test_state.questions)
-    correct_answers = 0
+    total_questions = len(test_state.question_ids)
     
-    # Подсчёт правильных ответов
-    for i, question in enumerate(test_state.questions):
-        user_answer = (test_state.answers_history[i] 
-                      if i < len(test_state.answers_history) 
-                      else None)
-        if user_answer == question.correct_answer:
-            correct_answers += 1
+    # Подсчёт правильных ответов: маска ответа == маска ключа
+    correct_answers = test_state.correct_count()
     
     score_percent = (correct_answers / total_questions) * 100
     status = "✅ ПРОЙДЕН" if score_percent >= 80 else "❌ НЕ ПРОЙДЕН"
@@ -34,5 +38,6 @@ def calculate_test_results(test_state: CurrentTestState) -> Dict:
         "total": total_questions,
         "percent": round(score_percent, 1),
         "status": status,
-        "details": f"{correct_answers}/{total_questions}"
+        "details": f"{correct_answers}/{total_questions}",
+        "answers": test_state.answers.tobytes()  # Маска ответа на каждый вопрос
     }
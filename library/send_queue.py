@@ -0,0 +1,226 @@
+"""
+Очередь исходящих запросов к Telegram под сессией бота (request middleware aiogram).
+Лимиты — token bucket'ы: общий (~30/с) и на чат (~1/с, с небольшим burst).
+Лимит чата — только на новые сообщения (send*/copy*/forward*): правки и удаления
+его не тратят. Фоновое сообщение берёт токен чата, лишь если после него останется
+ещё один — интерактивный ответ в тот же чат не ждёт из-за фона.
+Общий бюджет раздаёт один диспетчер по приоритету: ответы пользователю (INTERACTIVE)
+идут раньше фоновых рассылок (BACKGROUND: sweeper, обратный отсчёт, удаления).
+429 RetryAfter обрабатывается прозрачно: пауза всей очереди и повтор запроса.
+Запросы без chat_id (getUpdates, answerCallbackQuery, getMe) не ограничиваются.
+"""
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from enum import IntEnum
+from typing import Dict, FrozenSet, Optional
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# Приоритет запросов текущей задачи: фоновые задачи выставляют BACKGROUND у себя
+send_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "send_priority", default=Priority.INTERACTIVE
+)
+
+
+# Методы, на которые распространяется лимит Telegram на сообщения в чат
+_CHAT_LIMITED_PREFIXES = ("send", "copyMessage", "forwardMessage")
+_CHAT_EXEMPT: FrozenSet[str] = frozenset({"sendChatAction"})
+
+
+def is_chat_limited(api_method: str) -> bool:
+    return api_method.startswith(_CHAT_LIMITED_PREFIXES) and api_method not in _CHAT_EXEMPT
+
+
+def mark_background() -> None:
+    """Все запросы текущей задачи (и порождённых ею) — фоновые."""
+    send_priority.set(Priority.BACKGROUND)
+
+
+class TokenBucket:
+    """Token bucket в виртуальном времени: reserve() бронирует токен и возвращает ожидание."""
+    __slots__ = ("rate", "capacity", "_tokens", "_stamp")
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._stamp = time.monotonic()
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        self._tokens -= 1.0  # Долг допустим: следующий подождёт дольше
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def take_spare(self, now: Optional[float] = None, keep: float = 1.0) -> float:
+        """
+        Взять токен, только если останется keep; иначе ничего не брать и вернуть ожидание.
+        keep не больше capacity - 1: при capacity 1 резерв невозможен, берётся полный bucket.
+        """
+        now = time.monotonic() if now is None else now
+        keep = max(0.0, min(keep, self.capacity - 1.0))
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        if self._tokens - 1.0 >= keep:
+            self._tokens -= 1.0
+            return 0.0
+        return (keep + 1.0 - self._tokens) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Запретить выдачу на seconds (после 429). Параллельные паузы не складываются: берётся большая."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._tokens = min(self._tokens, -seconds * self.rate)
+        self._stamp = now
+
+    def idle(self, now: float) -> bool:
+        """Полон и не нужен: можно выбросить из таблицы чатов."""
+        return self._tokens + (now - self._stamp) * self.rate >= self.capacity
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """Request middleware: глобальный и поштучный по чатам лимит + приоритеты + RetryAfter."""
+
+    def __init__(
+        self,
+        global_rate: Optional[float] = None,
+        chat_rate: Optional[float] = None,
+        chat_burst: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        max_chats: int = 10_000
+    ):
+        self.global_bucket = TokenBucket(global_rate or settings.send_global_rate, 1.0)
+        self.chat_rate = chat_rate or settings.send_chat_rate
+        self.chat_burst = chat_burst or settings.send_chat_burst
+        self.max_retries = settings.send_max_retries if max_retries is None else max_retries
+        self.max_chats = max_chats
+        self._chats: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._seq = itertools.count()
+        self.metrics: Dict[str, float] = {
+            "requests": 0,
+            "retries": 0,           # Повторы после 429
+            "waiting": 0,           # Сейчас ждут (чат + общий бюджет)
+            "max_queue_depth": 0,
+            "wait_total_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    # === Бюджеты ===
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chats:
+                self._evict()
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    def _evict(self) -> None:
+        """Выбросить самые старые чаты, чьи bucket'ы уже полны (ничего не теряем)."""
+        now = time.monotonic()
+        for chat_id in list(itertools.islice(self._chats, 256)):
+            if self._chats[chat_id].idle(now):
+                del self._chats[chat_id]
+        while len(self._chats) >= self.max_chats:
+            self._chats.popitem(last=False)
+
+    async def _acquire_global(self, priority: Priority) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._queue = asyncio.PriorityQueue()
+            self._dispatcher = asyncio.create_task(self._dispatch(), name="send-scheduler")
+        grant = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((priority, next(self._seq), grant))
+        self.metrics["max_queue_depth"] = max(self.metrics["max_queue_depth"], self._queue.qsize())
+        await grant
+
+    async def _dispatch(self) -> None:
+        """Раздаёт общий бюджет: по приоритету, внутри приоритета — FIFO."""
+        while True:
+            _, _, grant = await self._queue.get()
+            if grant.done():
+                continue  # Запрос отменён, пока ждал
+            delay = self.global_bucket.reserve()
+            if delay:
+                await asyncio.sleep(delay)
+            if not grant.done():
+                grant.set_result(None)
+
+    # === Middleware ===
+    async def _acquire_chat(self, chat_id, priority: Priority, now: float) -> None:
+        if priority is Priority.INTERACTIVE:
+            delay = self._chat_bucket(chat_id).reserve(now)
+            if delay:
+                await asyncio.sleep(delay)
+            return
+        # Фон не залезает в долг и оставляет токен интерактивным ответам
+        while delay := self._chat_bucket(chat_id).take_spare():
+            await asyncio.sleep(delay)
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot, method):
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        priority = send_priority.get()
+        chat_limited = is_chat_limited(method.__api_method__)
+        self.metrics["requests"] += 1
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            self.metrics["waiting"] += 1
+            try:
+                if chat_limited:
+                    await self._acquire_chat(chat_id, priority, started)
+                await self._acquire_global(priority)
+            finally:
+                self.metrics["waiting"] -= 1
+            waited = time.monotonic() - started
+            self.metrics["wait_total_seconds"] += waited
+            self.metrics["max_wait_seconds"] = max(self.metrics["max_wait_seconds"], waited)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                self.metrics["retries"] += 1
+                logger.warning(f"429 {type(method).__name__} chat={chat_id}: пауза {e.retry_after} с")
+                self.global_bucket.pause(e.retry_after)
+                self._chat_bucket(chat_id).pause(e.retry_after)
+
+    async def stop(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+
+    def queue_depth(self) -> int:
+        return int(self.metrics["waiting"])
+
+    def stats(self) -> Dict[str, float]:
+        stats = dict(self.metrics)
+        requests = stats["requests"] or 1
+        stats["avg_wait_seconds"] = stats["wait_total_seconds"] / requests
+        stats["chats_tracked"] = len(self._chats)
+        return stats
+
+
+# Глобальный экземпляр
+send_scheduler = SendScheduler()
@@ -0,0 +1,202 @@
+"""
+Персистентные сессии тестов (SQLite WAL): переживают рестарт и деплой.
+Хранится минимум: индексы вопросов, маски ответов, позиция и дедлайн (UNIX-время,
+monotonic между процессами не переносится) + отпечаток банка: индексы верны только
+для той раскладки вопросов, с которой тест начат. Запись — write-behind: изменения
+копятся в памяти и сбрасываются одной транзакцией раз в session_flush_interval.
+"""
+import asyncio
+import logging
+import time
+from array import array
+from typing import Dict, List, Optional
+
+import aiosqlite
+
+from config.settings import settings
+from .enum import Difficulty
+from .models import CurrentTestState
+from .question_bank import question_bank_cache
+
+logger = logging.getLogger(__name__)
+
+_UPSERT = """
+    INSERT INTO sessions (user_id, chat_id, specialization, difficulty, question_ids, answers,
+                          current_index, deadline, full_name, position, department, bank_fingerprint)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        chat_id = excluded.chat_id, specialization = excluded.specialization,
+        difficulty = excluded.difficulty, question_ids = excluded.question_ids,
+        answers = excluded.answers, current_index = excluded.current_index,
+        deadline = excluded.deadline, full_name = excluded.full_name,
+        position = excluded.position, department = excluded.department,
+        bank_fingerprint = excluded.bank_fingerprint
+"""
+
+_SELECT = """
+    SELECT user_id, chat_id, specialization, difficulty, question_ids, answers,
+           current_index, deadline, full_name, position, department, bank_fingerprint
+    FROM sessions
+"""
+
+
+def _row(test_state: CurrentTestState) -> tuple:
+    """Сессия → строка таблицы (дедлайн monotonic → UNIX-время)."""
+    wall_deadline = time.time() + (test_state.deadline - time.monotonic())
+    return (
+        test_state.user_id,
+        test_state.chat_id,
+        test_state.specialization,
+        test_state.difficulty.value,
+        array("I", test_state.question_ids).tobytes(),
+        test_state.answers.tobytes(),
+        test_state.current_index,
+        wall_deadline,
+        test_state.full_name,
+        test_state.position,
+        test_state.department,
+        test_state.bank.fingerprint,  # Банк, с которым начат тест (после hot reload — прежний)
+    )
+
+
+class SessionStore:
+    """Write-behind хранилище активных сессий."""
+
+    DB_PATH = settings.data_dir / "sessions.db"
+
+    def __init__(self, db_path=None, flush_interval: Optional[float] = None):
+        self.db_path = db_path or self.DB_PATH
+        self.flush_interval = flush_interval or settings.session_flush_interval
+        self._db: Optional[aiosqlite.Connection] = None
+        self._dirty: Dict[int, CurrentTestState] = {}
+        self._deleted: set = set()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+
+    async def open(self) -> None:
+        if self._db is not None:
+            return
+        self._db = await aiosqlite.connect(self.db_path)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")  # WAL: потеря только при сбое ОС
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                user_id INTEGER PRIMARY KEY,
+                chat_id INTEGER,
+                specialization TEXT,
+                difficulty TEXT,
+                question_ids BLOB,
+                answers BLOB,
+                current_index INTEGER,
+                deadline REAL,
+                full_name TEXT,
+                position TEXT,
+                department TEXT,
+                bank_fingerprint TEXT
+            )
+        """)
+        async with self._db.execute("PRAGMA table_info(sessions)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if "bank_fingerprint" not in columns:  # БД до отпечатков: такие сессии отбросит load_all
+            await self._db.execute("ALTER TABLE sessions ADD COLUMN bank_fingerprint TEXT")
+        await self._db.commit()
+
+    # === Изменения (без I/O) ===
+    def save(self, test_state: CurrentTestState) -> None:
+        """Отметить сессию для записи при следующем flush."""
+        self._deleted.discard(test_state.user_id)
+        self._dirty[test_state.user_id] = test_state
+
+    def delete(self, user_id: int) -> None:
+        self._dirty.pop(user_id, None)
+        self._deleted.add(user_id)
+
+    # === Flush ===
+    async def flush(self) -> None:
+        if self._db is None or not (self._dirty or self._deleted):
+            return
+        dirty, deleted = self._dirty, self._deleted
+        self._dirty, self._deleted = {}, set()
+        try:
+            await self._db.executemany(_UPSERT, [_row(s) for s in dirty.values()])
+            await self._db.executemany("DELETE FROM sessions WHERE user_id = ?", [(u,) for u in deleted])
+            await self._db.commit()
+        except BaseException:
+            # Вернуть пачку в очередь (изменения, пришедшие во время записи, новее)
+            for user_id in self._deleted:
+                dirty.pop(user_id, None)
+            deleted -= self._dirty.keys()
+            dirty.update(self._dirty)
+            self._dirty, self._deleted = dirty, deleted | self._deleted
+            raise
+        self.flushes += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Session flush error: {e}")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="session-store-flush")
+
+    async def close(self) -> None:
+        """Остановить фоновый flush, дописать хвост и закрыть БД."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._db is not None:
+            await self.flush()
+            await self._db.close()
+            self._db = None
+
+    # === Восстановление ===
+    async def load_all(self) -> List[CurrentTestState]:
+        """Все сохранённые сессии одним запросом (дедлайн → monotonic этого процесса)."""
+        await self.open()
+        async with self._db.execute(_SELECT) as cursor:
+            rows = await cursor.fetchall()
+
+        loop = asyncio.get_running_loop()
+        banks = {}
+        for spec in {row[2] for row in rows}:
+            banks[spec] = await loop.run_in_executor(None, question_bank_cache.get, spec)
+
+        restored, dropped = [], []
+        offset = time.monotonic() - time.time()
+        for (user_id, chat_id, spec, difficulty, question_ids, answers,
+             current_index, deadline, full_name, position, department, fingerprint) in rows:
+            bank = banks.get(spec)
+            if bank is None or bank.fingerprint != fingerprint:
+                dropped.append((user_id,))  # Банк пропал или вопросы изменились — индексы не те
+                continue
+            restored.append(CurrentTestState(
+                bank=bank,
+                question_ids=tuple(array("I", question_ids)),
+                user_id=user_id,
+                chat_id=chat_id,
+                current_index=current_index,
+                answers=array("B", answers),
+                deadline=deadline + offset,
+                full_name=full_name,
+                position=position,
+                department=department,
+                specialization=spec,
+                difficulty=Difficulty(difficulty)
+            ))
+        if dropped:
+            await self._db.executemany("DELETE FROM sessions WHERE user_id = ?", dropped)
+            await self._db.commit()
+            logger.warning(f"Сессии: {len(dropped)} не восстановлены (банк изменился)")
+        return restored
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._dirty) + len(self._deleted), "flushes": self.flushes}
+
+
+# Глобальный экземпляр
+session_store = SessionStore()
@@ -0,0 +1,138 @@
+"""
+Реестр активных тестов + ленивое истечение дедлайнов.
+Сессия хранит абсолютный monotonic-дедлайн: хэндлеры проверяют его при каждом действии.
+Пользователей, молчавших до конца времени, уведомляет один редкий sweeper —
+без таймеров на сессию (большинство тестов заканчивается задолго до лимита).
+Сессии зеркалируются в SessionStore (SQLite WAL) и восстанавливаются на старте.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from aiogram import Bot
+
+from config.settings import settings
+from .models import CurrentTestState
+from .send_queue import mark_background
+from .session_store import SessionStore, session_store
+
+logger = logging.getLogger(__name__)
+
+ExpiredHandler = Callable[[Bot, CurrentTestState], Awaitable[None]]
+
+
+class SessionRegistry:
+    """Активные тесты по user_id + периодический sweeper просроченных."""
+
+    def __init__(self, sweep_interval: Optional[float] = None, store: Optional[SessionStore] = None):
+        self.sweep_interval = sweep_interval or settings.deadline_sweep_interval
+        self.sweep_concurrency = settings.deadline_sweep_concurrency
+        self.sweep_timeout = settings.deadline_sweep_timeout
+        self.store = store
+        self.sessions: Dict[int, CurrentTestState] = {}
+        self._bot: Optional[Bot] = None
+        self._on_expired: Optional[ExpiredHandler] = None
+        self._task: Optional[asyncio.Task] = None
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    # === Сессии ===
+    def start_session(self, test_state: CurrentTestState, chat_id: int) -> None:
+        """Зарегистрировать тест и выставить дедлайн по settings.difficulty_times."""
+        duration = settings.difficulty_times.get(test_state.difficulty.value, 25) * 60
+        test_state.chat_id = chat_id
+        test_state.start_time = time.monotonic()
+        test_state.deadline = test_state.start_time + duration
+        self.sessions[test_state.user_id] = test_state
+        self.touch(test_state)
+
+    def touch(self, test_state: CurrentTestState) -> None:
+        """Ответ/переход изменил сессию — записать при следующем flush хранилища."""
+        if self.store is not None:
+            self.store.save(test_state)
+
+    def get(self, user_id: int) -> Optional[CurrentTestState]:
+        return self.sessions.get(user_id)
+
+    def end_session(self, user_id: int) -> Optional[CurrentTestState]:
+        """Снять тест с учёта (завершён/истёк)."""
+        if self.store is not None:
+            self.store.delete(user_id)
+        return self.sessions.pop(user_id, None)
+
+    async def rehydrate(self) -> int:
+        """Восстановить сохранённые сессии одной выборкой (дедлайны не сдвигаются)."""
+        if self.store is None:
+            return 0
+        restored = await self.store.load_all()
+        for test_state in restored:
+            self.sessions[test_state.user_id] = test_state
+        if restored:
+            logger.info(f"🔄 Восстановлено сессий: {len(restored)}")
+        return len(restored)
+
+    # === Sweeper ===
+    def start(self, bot: Bot, on_expired: ExpiredHandler) -> None:
+        """Запустить sweeper: on_expired(bot, test_state) для простаивающих просроченных."""
+        self._bot = bot
+        self._on_expired = on_expired
+        if self.store is not None:
+            self.store.start()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="session-sweeper")
+            logger.info(f"⏰ Sweeper дедлайнов: каждые {self.sweep_interval:g} с")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.store is not None:
+            await self.store.close()  # Дописать хвост: рестарт не теряет ответы
+
+    def collect_expired(self, now: Optional[float] = None) -> List[CurrentTestState]:
+        """Снять с учёта все тесты с прошедшим дедлайном."""
+        now = time.monotonic() if now is None else now
+        expired = [s for s in self.sessions.values() if s.deadline <= now]
+        for test_state in expired:
+            self.end_session(test_state.user_id)
+        return expired
+
+    async def sweep_once(self) -> int:
+        """Завершить просроченные: параллельно (до sweep_concurrency), каждый — не дольше sweep_timeout."""
+        expired = self.collect_expired()
+        semaphore = asyncio.Semaphore(self.sweep_concurrency)
+
+        async def expire(test_state: CurrentTestState) -> None:
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(self._on_expired(self._bot, test_state), self.sweep_timeout)
+                except asyncio.TimeoutError:
+                    logger.error(f"Timeout {test_state.user_id}: завершение дольше {self.sweep_timeout} с")
+                except Exception as e:
+                    logger.error(f"Timeout {test_state.user_id}: {e}")
+
+        await asyncio.gather(*(expire(s) for s in expired))
+        self.expired += len(expired)
+        return len(expired)
+
+    async def _run(self) -> None:
+        mark_background()  # Уведомления sweeper'а уступают ответам пользователям
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            count = await self.sweep_once()
+            if count:
+                logger.info(f"⏰ Sweeper: завершено по времени {count} тест(ов)")
+
+    def stats(self) -> Dict[str, int]:
+        stats = {"active": len(self.sessions), "expired": self.expired}
+        if self.store is not None:
+            stats.update(self.store.stats())
+        return stats
+
+
+# Глобальный экземпляр
+active_sessions = SessionRegistry(store=session_store)
@@ -0,0 +1,100 @@
+"""
+Двухфазный запуск. Фаза 1 — импорты: модули только объявляют классы и глобальные
+экземпляры, без ФС/сети/логирования. Фаза 2 — bootstrap(): каталоги и логирование,
+затем I/O и прогрев параллельно (asyncio.gather + пулы потоков), затем фоновые задачи.
+Прогрев снимает холодные кэши с первых пользователей после деплоя: разбор JSON банков,
+сборку клавиатур, регистрацию шрифта сертификата, первое соединение с SQLite.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict
+
+from aiogram import Bot
+
+from config.settings import settings, prepare_runtime
+from .bank_watcher import bank_watcher
+from .countdown import countdown_refresher
+from .keyboards import get_main_keyboard, get_specializations_keyboard, get_difficulty_keyboard, get_finish_keyboard
+from .library import handle_timeout
+from .metrics import stats_reporter
+from .question_loader import get_bank_async
+from .sessions import active_sessions
+from .stats import stats_manager
+
+logger = logging.getLogger(__name__)
+
+
+async def _timed(name: str, step: Awaitable, timings: Dict[str, float], required: bool = True) -> Any:
+    """Выполнить шаг и записать его длительность; необязательный шаг не роняет запуск."""
+    started = time.perf_counter()
+    try:
+        return await step
+    except Exception as e:
+        if required:
+            raise
+        logger.warning(f"⚠️ Прогрев «{name}»: {e}")
+        return "ошибка"
+    finally:
+        timings[name] = time.perf_counter() - started
+
+
+async def _rehydrate() -> str:
+    return f"{await active_sessions.rehydrate()} восстановлено"
+
+
+async def _preload_banks() -> str:
+    """Все банки questions/*.json — в кэш (пул потоков question_loader)."""
+    banks = await asyncio.gather(*(get_bank_async(spec) for spec in settings.specializations))
+    loaded = [bank for bank in banks if bank is not None]
+    return f"{len(loaded)}/{len(banks)} банков, {sum(len(bank.questions) for bank in loaded)} вопросов"
+
+
+def _build_keyboards() -> str:
+    for build in (get_main_keyboard, get_specializations_keyboard, get_difficulty_keyboard, get_finish_keyboard):
+        build()
+    return "4 статичные"
+
+
+def _register_fonts() -> str:
+    from .certificates import register_fonts  # ReportLab — вне фазы импорта, здесь же в потоке
+    return register_fonts()
+
+
+async def _probe_api(bot: Bot) -> str:
+    me = await bot.get_me()
+    return f"@{me.username}"
+
+
+async def bootstrap(bot: Bot) -> Dict[str, float]:
+    """
+    Всё I/O запуска бота; вызывать один раз до приёма апдейтов.
+    Возвращает длительность шагов (сек) и пишет их в лог.
+    """
+    started = time.perf_counter()
+    prepare_runtime()  # Первым: остальное уже пишет в лог и в data/
+
+    timings: Dict[str, float] = {}
+    steps = {
+        "stats.db": (stats_manager.init_db(), True),  # Схема + миграция колонок для пересчёта
+        "сессии": (_rehydrate(), True),  # Тесты, начатые до рестарта, продолжаются с тем же дедлайном
+        "банки вопросов": (_preload_banks(), False),
+        "клавиатуры": (asyncio.to_thread(_build_keyboards), False),
+        "шрифт сертификата": (asyncio.to_thread(_register_fonts), False),
+        "Bot API getMe": (_probe_api(bot), False),
+    }
+    results = await asyncio.gather(*(
+        _timed(name, step, timings, required) for name, (step, required) in steps.items()
+    ))
+
+    bank_watcher.start()  # Горячая перезагрузка questions/*.json
+    active_sessions.start(bot, handle_timeout)  # Уведомления простаивающим с истёкшим временем
+    countdown_refresher.start(bot)  # ⏰ в вопросе (если COUNTDOWN_ENABLED)
+    stats_reporter.start(bot)  # Сводка метрик в лог (в polling других каналов нет)
+
+    total = time.perf_counter() - started
+    logger.info(f"🔥 Прогрев за {total * 1000:.0f} мс (сумма шагов {sum(timings.values()) * 1000:.0f} мс):")
+    for name, result in zip(steps, results):
+        detail = f" — {result}" if isinstance(result, str) else ""
+        logger.info(f"   {name}: {timings[name] * 1000:.0f} мс{detail}")
+    return timings
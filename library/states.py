@@ -12,7 +12,8 @@ class TestStates(StatesGroup):
     waiting_position = State()
     waiting_department = State()
     
-    # Выбор уровня сложности (автоматически)
+    # Выбор уровня сложности
+    waiting_difficulty = State()
     
     # Прохождение теста
     answering_question = State()
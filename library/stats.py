@@ -1,14 +1,24 @@
 """
 Управление статистикой прохождений (SQLite).
-Хранит успешные попытки по user_id.
+Хранит попытки по user_id + индексы вопросов и маски ответов для пересчёта (regrade).
 """
 import aiosqlite
 import asyncio
-from typing import List, Dict, Any
+from array import array
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
 from config.settings import settings
-from .models import TestResult
+from .models import TestResult, CurrentTestState
+
+# Колонки, добавленные после первой версии схемы (миграция ALTER TABLE)
+_EXTRA_COLUMNS = {
+    "question_ids": "BLOB",     # array('I') индексов вопросов в банке
+    "answers": "BLOB",          # array('B') масок ответов, по вопросу на байт
+    "correct_count": "INTEGER",
+    "total_questions": "INTEGER",
+    "bank_fingerprint": "TEXT",  # QuestionBank.fingerprint: для какой раскладки банка верны индексы
+}
 
 class StatsManager:
     """Менеджер статистики."""
@@ -33,21 +43,45 @@ class StatsManager:
                     result_json TEXT
                 )
             """)
+            async with db.execute("PRAGMA table_info(stats)") as cursor:
+                existing = {row[1] for row in await cursor.fetchall()}
+            for column, column_type in _EXTRA_COLUMNS.items():
+                if column not in existing:
+                    await db.execute(f"ALTER TABLE stats ADD COLUMN {column} {column_type}")
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_stats_specialization ON stats (specialization)"
+            )
             await db.commit()
     
-    async def save_result(self, user_id: int, result: TestResult):
-        """Сохраняет успешный результат."""
+    async def save_result(
+        self,
+        user_id: int,
+        result: TestResult,
+        test_state: Optional[CurrentTestState] = None
+    ):
+        """Сохраняет результат (+ вопросы и ответы попытки, если передан test_state)."""
+        question_ids = answers = fingerprint = None
+        if test_state is not None:
+            question_ids = array("I", test_state.question_ids).tobytes()
+            answers = test_state.answers.tobytes()
+            fingerprint = test_state.bank.fingerprint
         async with aiosqlite.connect(self.db_path) as db:
             await db.execute("""
-                INSERT INTO stats (user_id, specialization, difficulty, grade, percentage, date, result_json)
-                VALUES (?, ?, ?, ?, ?, datetime('now'), ?)
+                INSERT INTO stats (user_id, specialization, difficulty, grade, percentage, date, result_json,
+                                   question_ids, answers, correct_count, total_questions, bank_fingerprint)
+                VALUES (?, ?, ?, ?, ?, datetime('now'), ?, ?, ?, ?, ?, ?)
             """, (
                 user_id,
                 result.user_data.specialization,
                 result.user_data.difficulty.value,
                 result.grade,
                 result.percentage,
-                result.model_dump_json()
+                result.model_dump_json(),
+                question_ids,
+                answers,
+                result.correct_count,
+                result.total_questions,
+                fingerprint
             ))
             await db.commit()
     
@@ -0,0 +1,149 @@
+"""
+Webhook-режим: встроенное aiohttp-приложение вместо long polling (settings.bot_mode).
+Запрос Telegram проверяется по X-Telegram-Bot-Api-Secret-Token (обязателен) и сразу
+получает 200, апдейт обрабатывается фоновой задачей: одновременно не больше
+webhook_max_concurrency, в очереди — не больше webhook_max_pending (сверх — 503).
+/healthz и /metrics — на отдельном адресе (webhook_admin_host:port, по умолчанию loopback),
+наружу публикуется только путь webhook.
+"""
+import asyncio
+import hmac
+import logging
+import time
+from typing import Dict, Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+
+from config.settings import settings
+from .metrics import collect_stats
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """aiohttp-приложение приёма апдейтов + фоновая обработка с ограничением."""
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        secret: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.dp = dp
+        self.bot = bot
+        self.secret = settings.webhook_secret if secret is None else secret
+        if not self.secret:
+            raise ValueError("Webhook без секрета примет апдейт от любого отправителя: задайте WEBHOOK_SECRET")
+        self.max_pending = max_pending or settings.webhook_max_pending
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.webhook_max_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self.metrics: Dict[str, float] = {
+            "accepted": 0,
+            "rejected_secret": 0,
+            "rejected_overload": 0,
+            "failed": 0,
+            "max_handle_seconds": 0.0,
+        }
+
+    def app(self) -> web.Application:
+        """Публичное приложение: только приём апдейтов."""
+        app = web.Application()
+        app.router.add_post(settings.webhook_path, self.handle)
+        return app
+
+    def admin_app(self) -> web.Application:
+        """Служебное приложение (health/метрики) — для внутреннего адреса."""
+        app = web.Application()
+        app.router.add_get("/healthz", self.health)
+        app.router.add_get("/metrics", self.prometheus)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        # Байты: compare_digest на str с не-ASCII бросает TypeError (был бы 500 вместо 401)
+        received = request.headers.get(SECRET_HEADER, "").encode("utf-8", "surrogateescape")
+        if not hmac.compare_digest(received, self.secret.encode("utf-8")):
+            self.metrics["rejected_secret"] += 1
+            return web.Response(status=401)
+        if len(self._tasks) >= self.max_pending:
+            self.metrics["rejected_overload"] += 1
+            return web.Response(status=503)
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except Exception as e:
+            logger.warning(f"Webhook: некорректный апдейт: {e}")
+            return web.Response(status=400)
+
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.metrics["accepted"] += 1
+        return web.Response()  # 200 сразу: Telegram не ждёт обработки
+
+    async def _process(self, update: Update) -> None:
+        async with self._semaphore:
+            started = time.monotonic()
+            try:
+                await self.dp.feed_update(self.bot, update)
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.error(f"Webhook update {update.update_id}: {e}", exc_info=True)
+            finally:
+                elapsed = time.monotonic() - started
+                self.metrics["max_handle_seconds"] = max(self.metrics["max_handle_seconds"], elapsed)
+
+    async def health(self, request: web.Request) -> web.Response:
+        """Webhook + метрики всех компонентов (очередь отправки, антиспам, банки, отсчёт, ...)."""
+        return web.json_response({"webhook": self.stats(), **collect_stats(self.bot)})
+
+    async def prometheus(self, request: web.Request) -> web.Response:
+        """Гистограммы задержек Bot API (TunedAiohttpSession)."""
+        render = getattr(self.bot.session, "prometheus_text", None)
+        return web.Response(text=render() if render else "", content_type="text/plain")
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Дождаться принятых апдейтов перед остановкой."""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+
+    def stats(self) -> Dict[str, float]:
+        return {**self.metrics, "pending": len(self._tasks)}
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, stop_event: asyncio.Event) -> None:
+    """Поднять сервер, зарегистрировать webhook и работать до stop_event."""
+    server = WebhookServer(dp, bot)
+    runner = web.AppRunner(server.app())
+    admin_runner = web.AppRunner(server.admin_app())
+    await runner.setup()
+    await admin_runner.setup()
+    site = web.TCPSite(runner, settings.webhook_host, settings.webhook_port)
+    admin_site = web.TCPSite(admin_runner, settings.webhook_admin_host, settings.webhook_admin_port)
+
+    await dp.emit_startup(bot=bot, dispatcher=dp)
+    try:
+        await admin_site.start()
+        await site.start()
+        await bot.set_webhook(
+            settings.webhook_url.rstrip("/") + settings.webhook_path,
+            secret_token=server.secret,
+            allowed_updates=dp.resolve_used_update_types(),
+            max_connections=settings.webhook_max_concurrency
+        )
+        logger.info(
+            f"🌐 Webhook: {settings.webhook_host}:{settings.webhook_port}{settings.webhook_path} "
+            f"← {settings.webhook_url}; health/metrics: {settings.webhook_admin_host}:{settings.webhook_admin_port}"
+        )
+        await stop_event.wait()
+    finally:
+        await runner.shutdown()  # Перестаём принимать, принятое дорабатываем
+        await server.drain()
+        logger.info(f"🌐 Webhook остановлен: {server.stats()}")
+        await runner.cleanup()
+        await admin_runner.cleanup()
+        await dp.emit_shutdown(bot=bot, dispatcher=dp)
@@ -1,31 +1,20 @@
 """
-Пакет с роутерами специализаций (11 модулей).
-Каждый файл — отдельная специализация с полным FSM тестом.
+Пакет специализаций: один движок (engine.py) на все 11 специализаций.
+Список специализаций — settings.specializations, вопросы — questions/<spec>.json.
+Движок (aiogram + library) загружается при первом обращении (PEP 562).
 """
-# Импорт всех роутеров для удобства
-from .oupds import oupds_router
-from .ispolniteli import ispolniteli_router
-from .aliment import aliment_router
-from .doznanie import doznanie_router
-from .rozyisk import rozyisk_router
-from .prof import prof_router
-from .oko import oko_router
-from .informatika import informatika_router
-from .kadry import kadry_router
-from .bezopasnost import bezopasnost_router
-from .upravlenie import upravlenie_router
+from importlib import import_module
+from typing import Any
 
 __all__ = [
-    "oupds_router",
-    "ispolniteli_router",
-    "aliment_router",
-    "doznanie_router",
-    "rozyisk_router",
-    "prof_router",
-    "oko_router",
-    "informatika_router",
-    "kadry_router",
-    "bezopasnost_router",
-    "upravlenie_router",
+    "specializations_router",
+    "create_router",
 ]
 
+
+def __getattr__(name: str) -> Any:
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(".engine", __name__), name)
+    globals()[name] = value
+    return value
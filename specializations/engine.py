@@ -0,0 +1,205 @@
+"""
+specializations/engine.py: единый движок всех специализаций (вместо 11 копий роутера).
+Специализации — из settings.specializations; выбранная хранится в FSM (ввод данных)
+и в CurrentTestState (сам тест). Все callback'и теста идут в один хэндлер:
+callback data разбирается один раз (library.callbacks.decode), действие — из dict (O(1)).
+"""
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import SkipHandler
+from aiogram.filters import StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message
+
+from config.settings import settings
+from library import (
+    TestStates,
+    CurrentTestState,
+    active_sessions,
+    message_deleter,
+    draw_questions_async,
+    get_main_keyboard,
+    get_difficulty_keyboard,
+    show_first_question,
+    handle_answer_toggle,
+    handle_next_question,
+)
+from library import callbacks
+from library.callbacks import CallbackPayload
+from assets.logo import get_logo_text
+
+logger = logging.getLogger(__name__)
+
+Action = Callable[[CallbackQuery, FSMContext, CallbackPayload], Awaitable[None]]
+
+
+# ========================================
+# Действия callback'ов: (callback, state, разобранная кнопка)
+# ========================================
+async def start_test(callback: CallbackQuery, state: FSMContext, payload: CallbackPayload) -> None:
+    """Выбор специализации → ввод ФИО."""
+    spec = payload.specialization
+    if spec is None:
+        await callback.answer("❌ Неизвестная специализация")
+        return
+    message_deleter.schedule(callback.message)
+    await state.clear()
+    await state.update_data(specialization=spec)
+    await state.set_state(TestStates.waiting_full_name)
+    await callback.answer()
+    await callback.message.answer(get_logo_text(), reply_markup=get_main_keyboard())
+    await callback.message.answer("📝 Введите ФИО:")
+
+
+async def select_difficulty(callback: CallbackQuery, state: FSMContext, payload: CallbackPayload) -> None:
+    """Сложность → выборка вопросов, сессия с дедлайном, первый вопрос."""
+    difficulty = payload.level
+    if difficulty is None:
+        await callback.answer("❌ Неверный уровень")
+        return
+    data = await state.get_data()
+    spec = data.get("specialization")
+    if spec not in settings.specializations:
+        await callback.answer("⚠️ Сессия истекла, начните заново: /start")
+        return
+
+    bank, question_ids = await draw_questions_async(spec, difficulty, callback.from_user.id)
+    if not question_ids:
+        await callback.answer("❌ Вопросы не найдены!")
+        return
+
+    test_state = CurrentTestState(
+        bank=bank,
+        question_ids=question_ids,
+        user_id=callback.from_user.id,
+        full_name=data.get("full_name", ""),
+        position=data.get("position", ""),
+        department=data.get("department", ""),
+        specialization=spec,
+        difficulty=difficulty
+    )
+    active_sessions.start_session(test_state, callback.message.chat.id)
+    await state.set_state(TestStates.answering_question)
+
+    message_deleter.schedule(callback.message)
+    await callback.answer()
+    await callback.message.answer("🚀 <b>Тест начат!</b>", parse_mode="HTML")
+    await show_first_question(callback.message, test_state)
+    logger.info(f"✅ Тест {spec} ({difficulty.value}) запущен для {callback.from_user.id}")
+
+
+async def toggle_answer(callback: CallbackQuery, state: FSMContext, payload: CallbackPayload) -> None:
+    test_state = await _active_test(callback, payload)
+    if test_state is not None:
+        await handle_answer_toggle(callback, test_state, payload.option)
+
+
+async def next_question(callback: CallbackQuery, state: FSMContext, payload: CallbackPayload) -> None:
+    test_state = await _active_test(callback, payload)
+    if test_state is not None:
+        await handle_next_question(callback, test_state)
+        if active_sessions.get(callback.from_user.id) is None:
+            await state.clear()  # Тест завершён
+
+
+async def _active_test(callback: CallbackQuery, payload: CallbackPayload) -> Optional[CurrentTestState]:
+    """Сессия пользователя, если кнопка относится к её текущему вопросу."""
+    test_state = active_sessions.get(callback.from_user.id)
+    if test_state is None:
+        await callback.answer("⚠️ Тест не найден или завершён: /start")
+        return None
+    if payload.question != test_state.current_index:  # Двойной «Далее», клавиатура прошлого вопроса
+        await callback.answer("⚠️ Этот вопрос уже пройден")
+        return None
+    return test_state
+
+
+# Действие кнопки → хэндлер
+ACTIONS: Dict[str, Action] = {
+    callbacks.START: start_test,
+    callbacks.DIFFICULTY: select_difficulty,
+    callbacks.ANSWER: toggle_answer,
+    callbacks.NEXT: next_question,
+}
+
+
+# ========================================
+# FSM: сбор данных пользователя
+# ========================================
+async def _text_input(message: Message) -> Optional[str]:
+    """Текст ответа; стикер/фото/голосовое/пустая строка — просьба ввести текстом и None."""
+    text = (message.text or "").strip()
+    if not text:
+        await message.answer("✍️ Введите ответ текстом")
+        return None
+    return text
+
+
+async def process_full_name(message: Message, state: FSMContext):
+    """Сохранение ФИО."""
+    full_name = await _text_input(message)
+    if full_name is None:
+        return
+    await state.update_data(full_name=full_name)
+    message_deleter.schedule(message)
+    await state.set_state(TestStates.waiting_position)
+    await message.answer("💼 Должность:")
+
+
+async def process_position(message: Message, state: FSMContext):
+    """Сохранение должности."""
+    position = await _text_input(message)
+    if position is None:
+        return
+    await state.update_data(position=position)
+    message_deleter.schedule(message)
+    await state.set_state(TestStates.waiting_department)
+    await message.answer("🏢 Подразделение:")
+
+
+async def process_department(message: Message, state: FSMContext):
+    """Подразделение → выбор сложности."""
+    department = await _text_input(message)
+    if department is None:
+        return
+    await state.update_data(department=department)
+    message_deleter.schedule(message)
+    await state.set_state(TestStates.waiting_difficulty)
+    await message.answer("⚙️ Выберите уровень сложности:", reply_markup=get_difficulty_keyboard())
+
+
+async def handle_question_message(message: Message, state: FSMContext):
+    """Текст во время теста: ответы — только кнопками."""
+    await message.answer("👆 Отвечайте кнопками под вопросом")
+
+
+def create_router(actions: Dict[str, Action] = ACTIONS) -> Router:
+    """Роутер движка: по одному хэндлеру на шаг FSM + один на все callback'и теста.
+    Антиспам — на диспетчере (test_bot_main), не здесь."""
+    router = Router(name="specializations")
+
+    @router.callback_query()
+    async def dispatch_callback(callback: CallbackQuery, state: FSMContext):
+        payload = callbacks.decode(callback.data or "")
+        handler = payload and actions.get(payload.action)
+        if handler is None:
+            if callbacks.is_stale(callback.data or ""):
+                await callback.answer("⚠️ Кнопка устарела, начните заново: /start")
+                return
+            raise SkipHandler()  # Не наш callback — дальше по роутерам
+        try:
+            await handler(callback, state, payload)
+        except Exception as e:
+            logger.error(f"Callback {callback.data} ({callback.from_user.id}): {e}", exc_info=True)
+            await callback.answer("❌ Ошибка, попробуйте ещё раз")
+
+    router.message.register(process_full_name, StateFilter(TestStates.waiting_full_name))
+    router.message.register(process_position, StateFilter(TestStates.waiting_position))
+    router.message.register(process_department, StateFilter(TestStates.waiting_department))
+    router.message.register(handle_question_message, StateFilter(TestStates.answering_question))
+    return router
+
+
+specializations_router = create_router()
@@ -5,19 +5,17 @@ test_bot_main.py — Production-ready Aiogram 3.x Telegram тест-бот дл
 """
 
 import asyncio
-import importlib
 import logging
-import os
 import sys
 import signal
 from pathlib import Path
 from typing import List
 
-from aiogram import Bot, Dispatcher, Router, F
+from aiogram import Bot, Dispatcher, Router
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import Message
 from aiogram.filters import Command
 
 try:
@@ -25,53 +23,29 @@ try:
 except ImportError as e:
     raise ImportError("config.settings не найден. Создайте файл с class Settings и api_token = os.getenv('API_TOKEN')") from e
 
-# ✅ Исправленный импорт через __init__.py
-try:
-    from library import AntiSpamMiddleware
-except ImportError as e:
-    raise ImportError("library.AntiSpamMiddleware не найден. Создайте middleware в library или удалите строку.") from e
-
-# Список роутеров для динамической загрузки
-SPECIALIZATIONS = [
-    "oupds", "ispolniteli", "aliment", "doznanie", "rozyisk",
-    "prof", "oko", "informatika", "kadry", "bezopasnost", "upravlenie"
-]
+from library import anti_spam, bootstrap, active_sessions, countdown_refresher, send_scheduler, message_deleter
+from library.bank_watcher import bank_watcher
+from library.metrics import stats_reporter
+from library import get_specializations_keyboard
+from library.webhook import run_webhook
+from library.http_session import create_bot_session
+from specializations import specializations_router
 
-# Настройка логирования
-os.makedirs("logs", exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("logs/bot.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Логирование настраивает bootstrap() (config.settings.prepare_runtime), не импорт
 logger = logging.getLogger(__name__)
 
 # Глобальные переменные
 bot: Bot | None = None
 dp: Dispatcher | None = None
 
-def load_router(module_name: str) -> bool:
-    """Загрузка роутера с проверкой через importlib."""
-    try:
-        spec_module = importlib.import_module(f"specializations.{module_name}")
-        if not hasattr(spec_module, f"{module_name}_router"):
-            raise AttributeError(f"Роутер {module_name}_router не найден")
-        router = getattr(spec_module, f"{module_name}_router")
-        dp.include_router(router)
-        logger.info(f"✅ Загружен роутер: {module_name}_router")
-        return True
-    except (ImportError, AttributeError) as e:
-        logger.error(f"✗ Ошибка загрузки {module_name}: {e}")
-        return False
-
-async def on_startup():
-    logger.info("🚀 Бот инициализирован и готов к работе")
-
 async def on_shutdown():
     logger.info("🛑 Завершение работы бота")
+    await bank_watcher.stop()
+    await countdown_refresher.stop()
+    await active_sessions.stop()
+    await message_deleter.stop()
+    await stats_reporter.stop()  # Итоговая сводка всех метрик
+    await send_scheduler.stop()
     # Graceful shutdown задач
     if dp:
         tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
@@ -91,67 +65,57 @@ async def main():
         logger.error("API_TOKEN отсутствует")
         sys.exit(1)
     
-    bot = Bot(token=settings.api_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    session = create_bot_session()  # Пул/keep-alive/таймауты по методам + гистограммы задержек
+    bot = Bot(token=settings.api_token, session=session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    bot.session.middleware(send_scheduler)  # Лимиты Telegram + приоритеты + RetryAfter
+    await bootstrap(bot)  # Логирование, каталоги, БД, сессии, прогрев (с отчётом по шагам), фоновые задачи
     dp = Dispatcher(storage=MemoryStorage())
     
-    dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
     
-    # ✅ Middleware ПЕРЕД роутерами
-    try:
-        dp.message.middleware(AntiSpamMiddleware())
-        logger.info("✅ AntiSpamMiddleware подключен")
-    except Exception as e:
-        logger.warning(f"Middleware warning: {e}")
+    # ✅ Антиспам: один экземпляр, до фильтров всех роутеров — сообщения и callback'и
+    dp.message.outer_middleware(anti_spam)
+    dp.callback_query.outer_middleware(anti_spam)
+    logger.info(f"✅ Антиспам: {anti_spam.rate:g}/с, всплеск {anti_spam.burst}")
     
     # === ROOT РОУТЕР /start ТОЛЬКО ===
     main_router = Router()
     
     @main_router.message(Command("start"))
     async def cmd_start(message: Message):
-        kb = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🚨 ООУПДС", callback_data="oupds")],
-            [InlineKeyboardButton(text="📊 Исполнители", callback_data="ispolniteli")],
-            [InlineKeyboardButton(text="💰 Алименты", callback_data="aliment")],
-            [InlineKeyboardButton(text="🎯 Дознание", callback_data="doznanie")],
-            [InlineKeyboardButton(text="🔍 Розыск", callback_data="rozyisk")],
-            [InlineKeyboardButton(text="📚 Профстандарты", callback_data="prof")],
-            [InlineKeyboardButton(text="👁️ ОКО", callback_data="oko")],
-            [InlineKeyboardButton(text="💻 Информатизация", callback_data="informatika")],
-            [InlineKeyboardButton(text="👥 Кадры", callback_data="kadry")],
-            [InlineKeyboardButton(text="🛡️ Безопасность", callback_data="bezopasnost")],
-            [InlineKeyboardButton(text="🏛️ Управление", callback_data="upravlenie")]
-        ])
-        await message.answer("🧪 ФССП Тест-бот\nВыберите специализацию:", reply_markup=kb)
+        await message.answer("🧪 ФССП Тест-бот\nВыберите специализацию:", reply_markup=get_specializations_keyboard())
     
     dp.include_router(main_router)
     
-    # === 11 СПЕЦИАЛИЗАЦИЙ ===
-    loaded_count = 0
-    for spec in SPECIALIZATIONS:
-        if load_router(spec):
-            loaded_count += 1
-    
-    logger.info(f"🚀 Загружено роутеров: {loaded_count}/{len(SPECIALIZATIONS)}")
-    logger.info("Запуск polling...")
+    # === 11 СПЕЦИАЛИЗАЦИЙ: один роутер-движок ===
+    dp.include_router(specializations_router)
+    logger.info(f"🚀 Специализаций: {len(settings.specializations)}")
+    logger.info(f"Запуск {settings.bot_mode}...")
     
     # ✅ Улучшенные signals (loop-aware)
     loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
     def signal_handler(signum, frame):
         logger.info(f"Сигнал {signum}")
-        if dp:
+        if settings.bot_mode == "webhook":
+            loop.call_soon_threadsafe(stop_event.set)
+        elif dp:
             loop.call_soon_threadsafe(dp.stop_polling)
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    # Polling с обработкой ошибок
+    # Polling (по умолчанию) / webhook с обработкой ошибок
     try:
-        await dp.start_polling(bot)
+        if settings.bot_mode == "webhook":
+            await run_webhook(dp, bot, stop_event)
+        else:
+            await bot.delete_webhook()  # Иначе getUpdates вернёт конфликт после webhook-режима
+            await dp.start_polling(bot)
     except KeyboardInterrupt:
         logger.info("KeyboardInterrupt")
     except Exception as e:
-        logger.error(f"Polling error: {e}", exc_info=True)
+        logger.error(f"{settings.bot_mode} error: {e}", exc_info=True)
 
 if __name__ == "__main__":
     try: